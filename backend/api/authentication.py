@@ -2,25 +2,72 @@ from rest_framework.authentication import BaseAuthentication
 from django.utils import timezone
 from django.http import JsonResponse
 from api.models import UserAccessToken
+from api.token_cache import token_cache
+from api.token_usage import last_used_buffer
 from functools import wraps
 from utils.message import ERROR_MESSAGES
 from django.conf import settings
 import jwt
 
 
+class AuthContext:
+    """
+    Outcome of authenticating one request: the raw bearer token, the resolved
+    UserAccessToken row (None when authentication failed) and its claims.
+    """
+
+    def __init__(self, token=None, access_token=None, claims=None):
+        self.token = token
+        self.access_token = access_token
+        self.claims = claims
+
+    @property
+    def user(self):
+        return self.access_token.user_data if self.access_token else None
+
+
+def get_auth_context(request):
+    """
+    Resolve the bearer token of a request once and memoize the result on the
+    underlying HttpRequest, so DRF authentication, require_access_token,
+    IsOwner and views share a single lookup.
+    """
+    http_request = getattr(request, '_request', request)
+    context = getattr(http_request, '_auth_context', None)
+    if context is None:
+        context = AuthContext()
+        auth_header = http_request.headers.get('Authorization')
+        if auth_header and auth_header.startswith('Bearer '):
+            context.token = auth_header.split(' ')[1]
+            verified = AccessTokenAuthentication.verify(context.token)
+            if verified:
+                context.access_token, context.claims = verified
+        http_request._auth_context = context
+    return context
+
+
 class AccessTokenAuthentication(BaseAuthentication):
     """
     Custom authentication using user_access_token from the Authorization header.
-    Validates both DB and JWT expiry.
+    Validates both DB and JWT expiry. Verified tokens are kept in token_cache
+    so repeat requests skip the decode, the lookup and the last_used_at write.
+    The verified JWT claims are returned as request.auth.
     """
 
     def authenticate(self, request):
-        auth_header = request.headers.get('Authorization')
-
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return None  
-
-        token = auth_header.split(' ')[1]
+        context = get_auth_context(request)
+        if context.access_token is None:
+            return None
+        return (context.user, context.claims)
+
+    @staticmethod
+    def verify(token):
+        cached = token_cache.get(token)
+        if cached is not None:
+            access_token, payload = cached
+            if last_used_buffer.write_behind:
+                last_used_buffer.record(access_token.user_access_token_id, timezone.now())
+            return (access_token, payload)
 
         try:
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
@@ -30,8 +77,7 @@ class AccessTokenAuthentication(BaseAuthentication):
             return None  
 
         try:
-            access_token = UserAccessToken.objects.select_related('user_data').get(
-                user_access_token=token,
+            access_token = UserAccessToken.objects.for_token(token).select_related('user_data__user_role').get(
                 active=True,
                 user_data__active=True
             )
@@ -42,9 +88,14 @@ class AccessTokenAuthentication(BaseAuthentication):
             return None 
 
         access_token.last_used_at = timezone.now()
-        access_token.save(update_fields=['last_used_at'])
+        if last_used_buffer.write_behind:
+            last_used_buffer.record(access_token.user_access_token_id, access_token.last_used_at)
+        else:
+            access_token.save(update_fields=['last_used_at'])
+
+        token_cache.set(token, access_token, payload)
 
-        return (access_token.user_data, None)
+        return (access_token, payload)
 
 
 def require_access_token(view_func):
@@ -78,7 +129,7 @@ def require_access_token(view_func):
                 "error": ERROR_MESSAGES.get("AUTHENTICATION_INVALID", "Invalid or expired token.")
             }, status=401)
 
-        request.user = user_auth_tuple[0]
+        request.user, request.auth = user_auth_tuple
         return view_func(request, *args, **kwargs)
 
     return _wrapped_view
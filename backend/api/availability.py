@@ -0,0 +1,58 @@
+from collections import defaultdict
+
+from .models import Order
+
+
+# Orders in these statuses no longer hold their units.
+RELEASED_STATUSES = ['cancelled']
+
+
+class AvailabilityCalendar:
+    """
+    Reserved quantity over time for one product. max_reserved() sweeps the
+    reservation endpoints inside the asked range in time order, O(k log k)
+    for k overlapping reservations. Each stock check loads its calendar
+    with one query and asks it once, so a prebuilt index would not pay off.
+    """
+
+    def __init__(self, reservations):
+        self.reservations = [(start, end, quantity) for start, end, quantity in reservations if start < end]
+
+    def max_reserved(self, start, end):
+        """Highest reserved quantity at any instant in [start, end)."""
+        if start >= end:
+            return 0
+        events = []
+        for res_start, res_end, quantity in self.reservations:
+            if res_start < end and res_end > start:
+                events.append((max(res_start, start), quantity))
+                events.append((min(res_end, end), -quantity))
+        # Releases sort before holds at the same instant: back-to-back rentals do not overlap.
+        events.sort()
+        best = reserved = 0
+        for _, delta in events:
+            reserved += delta
+            best = max(best, reserved)
+        return best
+
+
+def reservation_calendars(product_ids, start, end):
+    """
+    One calendar per product from the orders that hold units somewhere in
+    [start, end), loaded with a single query.
+    """
+    reservations = defaultdict(list)
+    orders = (
+        Order.objects.filter(product_id__in=set(product_ids), timestamp_from__lt=end, timestamp_to__gt=start)
+        .exclude(status__status_name__in=RELEASED_STATUSES)
+        .values_list('product_id', 'timestamp_from', 'timestamp_to', 'quantity')
+    )
+    for product_id, order_start, order_end, quantity in orders:
+        reservations[product_id].append((order_start, order_end, quantity))
+    return {product_id: AvailabilityCalendar(reservations[product_id]) for product_id in set(product_ids)}
+
+
+def available_quantity(product, start, end):
+    """Units of `product` free for the whole of [start, end)."""
+    calendar = reservation_calendars([product.product_id], start, end)[product.product_id]
+    return max(product.product_qty - calendar.max_reserved(start, end), 0)
@@ -0,0 +1,134 @@
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .availability import RELEASED_STATUSES
+from .catalog_cache import bump_availability_version
+from .counters import add_to_counter
+from .models import Order, ProductDayReservation, Status
+
+
+# Order fields that decide which units it holds, in order_hold() order.
+HOLD_FIELDS = ('status_id', 'product_id', 'timestamp_from', 'timestamp_to', 'quantity')
+
+
+def reservation_days(start, end):
+    """Calendar days (in the current time zone) that [start, end) touches."""
+    if not start or not end or start >= end:
+        return []
+    first = timezone.localtime(start).date()
+    last = timezone.localtime(end - timedelta(microseconds=1)).date()
+    return [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+
+def _apply_deltas(deltas):
+    for (product_id, day), delta in sorted(deltas.items()):
+        if delta:
+            add_to_counter(ProductDayReservation, {'product_id': product_id, 'day': day}, 'reserved', delta)
+
+
+def released_status_ids():
+    return set(Status.objects.filter(status_name__in=RELEASED_STATUSES).values_list('status_id', flat=True))
+
+
+def order_hold(order_values, released):
+    """
+    (product_id, start, end, quantity) an order holds, or None once it is
+    released. `order_values` holds the order's HOLD_FIELDS.
+    """
+    if order_values is None:
+        return None
+    status_id, product_id, start, end, quantity = order_values
+    if status_id in released:
+        return None
+    return product_id, start, end, quantity
+
+
+def move_hold(before, after):
+    """Apply the change from one order hold to another (either may be None) to the day index."""
+    if before == after:
+        return
+    deltas = Counter()
+    if before:
+        product_id, start, end, quantity = before
+        for day in reservation_days(start, end):
+            deltas[(product_id, day)] -= quantity
+    if after:
+        product_id, start, end, quantity = after
+        for day in reservation_days(start, end):
+            deltas[(product_id, day)] += quantity
+    _apply_deltas(deltas)
+
+
+def rebuild_day_reservations(batch_size=1000):
+    """
+    Recompute the whole index from orders, batch_size orders at a time,
+    and return the number of (product, day) rows written.
+    """
+    released = released_status_ids()
+    totals = Counter()
+    last_id = 0
+    while True:
+        orders = list(
+            Order.objects.filter(order_id__gt=last_id).exclude(status_id__in=released)
+            .order_by('order_id')
+            .values_list('order_id', 'product_id', 'timestamp_from', 'timestamp_to', 'quantity')[:batch_size]
+        )
+        if not orders:
+            break
+        last_id = orders[-1][0]
+        for _, product_id, start, end, quantity in orders:
+            for day in reservation_days(start, end):
+                totals[(product_id, day)] += quantity
+
+    rows = [
+        ProductDayReservation(product_id=product_id, day=day, reserved=reserved)
+        for (product_id, day), reserved in totals.items() if reserved
+    ]
+    with transaction.atomic():
+        ProductDayReservation.objects.all().delete()
+        ProductDayReservation.objects.bulk_create(rows, batch_size=batch_size)
+        transaction.on_commit(bump_availability_version)
+    return len(rows)
+
+
+def parse_bound(value, name, end=False):
+    """
+    A datetime from an ISO 8601 datetime or date. A bare date means the start
+    of that day, or with end=True the end of it, so ranges of dates are
+    inclusive.
+    """
+    try:
+        day = parse_date(value)
+        if day is not None:
+            parsed = datetime.combine(day + timedelta(days=1) if end else day, time.min)
+        else:
+            parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 date or datetime.")
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def filter_available(queryset, start, end, quantity=1):
+    """
+    Keep products (or product cards) with at least `quantity` units free on
+    every day [start, end) touches. Days are the index's unit, so two
+    rentals on the same day count against each other even if their hours
+    do not overlap; checkout still checks exact times.
+    """
+    days = reservation_days(start, end)
+    if not days:
+        raise ValueError("available_to must be after available_from.")
+    full = ProductDayReservation.objects.filter(
+        product_id=OuterRef('product_id'),
+        day__gte=days[0],
+        day__lte=days[-1],
+        reserved__gt=OuterRef('product_qty') - quantity,
+    )
+    return queryset.filter(product_qty__gte=quantity).exclude(Exists(full))
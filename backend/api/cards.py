@@ -0,0 +1,71 @@
+from django.db import transaction
+
+from .facets import lowest_active_prices
+from .models import Product, ProductCard
+
+
+CARD_DURATIONS = ['hour', 'day', 'week', 'month', 'year']
+
+CARD_FIELDS = [
+    'product_name', 'product_description', 'product_qty',
+    'category_id', 'category_name', 'vendor_id', 'vendor_name',
+    'likes', 'active', 'created_at',
+] + [f'price_{duration}' for duration in CARD_DURATIONS]
+
+
+def refresh_product_cards(product_ids):
+    """
+    Rebuild the cards of the given products from their source rows with two
+    reads (products with category and vendor, lowest price per duration)
+    and one bulk write each for new and changed cards. Cards of products
+    that no longer exist are removed.
+    """
+    product_ids = sorted(set(product_ids))
+    if not product_ids:
+        return
+
+    with transaction.atomic():
+        products = Product.objects.filter(product_id__in=product_ids).select_related('category', 'created_by')
+        lowest = lowest_active_prices(product_ids)
+        existing = set(
+            ProductCard.objects.select_for_update()
+            .filter(product_id__in=product_ids)
+            .values_list('product_id', flat=True)
+        )
+
+        created, updated = [], []
+        for product in products:
+            prices = lowest.get(product.product_id, {})
+            card = ProductCard(
+                product_id=product.product_id,
+                product_name=product.product_name,
+                product_description=product.product_description,
+                product_qty=product.product_qty,
+                category_id=product.category_id,
+                category_name=product.category.category_name if product.category else None,
+                vendor_id=product.created_by_id,
+                vendor_name=product.created_by.user_name,
+                likes=product.likes,
+                active=product.active,
+                created_at=product.created_at,
+                **{f'price_{duration}': prices.get(duration) for duration in CARD_DURATIONS}
+            )
+            (updated if product.product_id in existing else created).append(card)
+
+        if created:
+            ProductCard.objects.bulk_create(created)
+        if updated:
+            ProductCard.objects.bulk_update(updated, CARD_FIELDS)
+
+        found = {card.product_id for card in created + updated}
+        missing = [product_id for product_id in product_ids if product_id not in found]
+        if missing:
+            ProductCard.objects.filter(product_id__in=missing).delete()
+
+
+def rename_category_on_cards(category_id, category_name):
+    ProductCard.objects.filter(category_id=category_id).update(category_name=category_name)
+
+
+def rename_vendor_on_cards(vendor_id, vendor_name):
+    ProductCard.objects.filter(vendor_id=vendor_id).update(vendor_name=vendor_name)
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from .singleflight import single_flight
+
+
+VERSION_KEY = 'catalog:version'
+AVAILABILITY_VERSION_KEY = 'catalog:availability_version'
+
+# Query params whose results also depend on orders, not just catalog writes.
+AVAILABILITY_PARAMS = ('available_from', 'available_to')
+
+DEFAULTS = {
+    'ENABLED': True,
+    'TTL': 300,
+    'STALE_TTL': 60,
+    'BACKEND': 'default',
+}
+
+
+def _config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'CATALOG_CACHE', {}))
+    return config
+
+
+def _cache():
+    return caches[_config()['BACKEND']]
+
+
+def _version(key):
+    cache = _cache()
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses old keys.
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(key):
+    cache = _cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+
+
+def catalog_version():
+    return _version(VERSION_KEY)
+
+
+def bump_catalog_version():
+    """Invalidate every cached catalog response at once."""
+    _bump(VERSION_KEY)
+
+
+def availability_version():
+    return _version(AVAILABILITY_VERSION_KEY)
+
+
+def bump_availability_version():
+    """Invalidate only the cached responses filtered by availability."""
+    _bump(AVAILABILITY_VERSION_KEY)
+
+
+def response_key(view_name, request, view_kwargs):
+    params = sorted((key, sorted(request.GET.getlist(key))) for key in request.GET)
+    raw = json.dumps(
+        [request.build_absolute_uri('/'), sorted(view_kwargs.items()), params],
+        default=str
+    )
+    digest = hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    version = catalog_version()
+    if any(param in request.GET for param in AVAILABILITY_PARAMS):
+        version = f"{version}.{availability_version()}"
+    return f"catalog:{version}:{view_name}:{digest}"
+
+
+def cache_catalog_response(view_name):
+    """
+    Cache successful GET responses of a public catalog view, keyed by the
+    normalized query params and the current catalog version. Catalog writes
+    call bump_catalog_version(), so stale pages are never served across a
+    write; availability-filtered pages also carry the availability version,
+    which order writes bump without touching the rest of the cache. Within
+    a version, misses are coalesced by single_flight so one request
+    rebuilds an expired page while the others reuse its result.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            config = _config()
+            if request.method != 'GET' or not config['ENABLED']:
+                return view_func(request, *args, **kwargs)
+
+            def build():
+                response = view_func(request, *args, **kwargs)
+                cached = {
+                    'content': response.content,
+                    'content_type': response['Content-Type'],
+                    'status': response.status_code,
+                }
+                return cached, response.status_code == 200
+
+            cached = single_flight.get_or_build(
+                _cache(),
+                response_key(view_name, request, kwargs),
+                build,
+                ttl=config['TTL'],
+                stale_ttl=config['STALE_TTL'],
+            )
+            return HttpResponse(cached['content'], content_type=cached['content_type'], status=cached['status'])
+        return _wrapped_view
+    return decorator
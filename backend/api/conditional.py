@@ -0,0 +1,77 @@
+import hashlib
+import json
+
+from django.db.models import Count, Max, Q, Sum
+
+from .catalog_cache import catalog_version
+from .models import Cart, Order, Product, Wishlist
+
+
+# ETag functions for django.views.decorators.http.condition. Each one reads
+# row versions or timestamps with a single aggregate query, so an unchanged
+# resource is answered with 304 before any serialization runs.
+
+
+def _etag(*parts):
+    return hashlib.sha1(json.dumps(parts, default=str).encode('utf-8')).hexdigest()
+
+
+def _user_id(request):
+    return getattr(request.user, 'user_data_id', None)
+
+
+def product_etag(request, id, *args, **kwargs):
+    row = Product.objects.filter(product_id=id).values_list(
+        'version', 'created_by__updated_at', 'category__category_name'
+    ).first()
+    if row is None:
+        return None
+    return _etag('product', id, *row)
+
+
+def order_list_etag(request, id=None, *args, **kwargs):
+    user_id = _user_id(request)
+    if user_id is None:
+        return None
+
+    orders = Order.objects.filter(user_data_id=user_id)
+    if id:
+        orders = orders.filter(order_id=id)
+    summary = orders.aggregate(
+        count=Count('order_id'),
+        last_id=Max('order_id'),
+        versions=Sum('version'),
+        product_versions=Sum('product__version'),
+        # The listing also embeds the customer, the vendor and the payment.
+        customer_updated=Max('user_data__updated_at'),
+        vendor_updated=Max('product__created_by__updated_at'),
+        payment_statuses=Sum('payment__status_id'),
+        active_payments=Count('payment', filter=Q(payment__active=True)),
+    )
+    return _etag('orders', user_id, id, summary)
+
+
+def cart_list_etag(request, *args, **kwargs):
+    user_id = _user_id(request)
+    if user_id is None:
+        return None
+
+    summary = Cart.objects.filter(user_id=user_id).aggregate(
+        count=Count('cart_id'),
+        ids=Sum('cart_id'),
+        quantity=Sum('quantity'),
+    )
+    # Cart totals depend on product prices, which only change with the catalog.
+    return _etag('cart', user_id, summary, catalog_version())
+
+
+def user_profile_etag(request, *args, **kwargs):
+    user_id = _user_id(request)
+    if user_id is None:
+        return None
+
+    summary = Wishlist.objects.filter(user_id=user_id).aggregate(
+        count=Count('wishlist_id'),
+        ids=Sum('wishlist_id'),
+    )
+    return _etag('profile', user_id, request.user.updated_at, summary, catalog_version())
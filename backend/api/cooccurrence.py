@@ -0,0 +1,141 @@
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from scipy import sparse
+
+from .catalog_cache import bump_catalog_version
+from .models import Order, Product, ProductLike, ProductRecommendation, UserData, Wishlist
+
+
+DEFAULTS = {
+    'TOP_K': 20,
+    'BLOCK_SIZE': 2000,
+    'CHUNK_SIZE': 100000,
+    'WEIGHTS': {'order': 3.0, 'wishlist': 2.0, 'like': 1.0},
+}
+
+
+def _config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'RECOMMENDATIONS', {}))
+    return config
+
+
+def _sources():
+    return [
+        ('order', Order.objects.values_list('user_data_id', 'product_id')),
+        ('wishlist', Wishlist.objects.values_list('user_id', 'product_id')),
+        ('like', ProductLike.objects.values_list('user_id', 'product_id')),
+    ]
+
+
+def interaction_matrix(chunk_size, weights):
+    """
+    Sparse users x products matrix of interaction strength. Each source
+    counts once per (user, product) pair, whatever the number of rows, and
+    is read chunk_size rows at a time, so peak memory follows the number of
+    distinct pairs rather than the number of orders. Rows and columns are
+    indexed by user_data_id and product_id directly.
+    """
+    shape = (
+        (UserData.objects.aggregate(last=Max('user_data_id'))['last'] or 0) + 1,
+        (Product.objects.aggregate(last=Max('product_id'))['last'] or 0) + 1,
+    )
+
+    matrix = sparse.csr_matrix(shape, dtype=np.float32)
+    for kind, queryset in _sources():
+        seen = sparse.csr_matrix(shape, dtype=np.float32)
+        rows = queryset.order_by().iterator(chunk_size=chunk_size)
+        while True:
+            chunk = np.array(list(islice(rows, chunk_size)), dtype=np.int64)
+            if not len(chunk):
+                break
+            seen = seen + sparse.csr_matrix(
+                (np.ones(len(chunk), dtype=np.float32), (chunk[:, 0], chunk[:, 1])),
+                shape=shape
+            )
+            seen.data[:] = 1
+        matrix = matrix + weights[kind] * seen
+    return matrix
+
+
+def top_neighbours(matrix, top_k, block_size):
+    """
+    Yield (product_id, [(neighbour_id, score), ...]) for every product with
+    interactions, best first. Scores are cosine similarities of the product
+    columns; the co-occurrence product X^T X is computed block_size columns
+    at a time and never held whole.
+    """
+    columns = matrix.tocsc()
+    rows = columns.T.tocsr()
+    norms = np.sqrt(np.asarray(columns.multiply(columns).sum(axis=0)).ravel())
+    products = np.flatnonzero(norms)
+
+    for start in range(0, len(products), block_size):
+        block_products = products[start:start + block_size]
+        block = (rows @ columns[:, block_products]).tocsc()
+
+        for j, product_id in enumerate(block_products):
+            lo, hi = block.indptr[j], block.indptr[j + 1]
+            neighbours = block.indices[lo:hi]
+            scores = block.data[lo:hi] / (norms[neighbours] * norms[product_id])
+
+            keep = neighbours != product_id
+            neighbours, scores = neighbours[keep], scores[keep]
+            if len(scores) > top_k:
+                best = np.argpartition(-scores, top_k)[:top_k]
+                neighbours, scores = neighbours[best], scores[best]
+            order = np.lexsort((neighbours, -scores))
+            yield int(product_id), [(int(neighbours[i]), float(scores[i])) for i in order]
+
+
+def _write_block(block):
+    product_ids = {product_id for product_id, _ in block}
+    product_ids.update(neighbour for _, neighbours in block for neighbour, _ in neighbours)
+    # Skip products deleted since the matrix was read.
+    existing = set(Product.objects.filter(product_id__in=product_ids).values_list('product_id', flat=True))
+
+    with transaction.atomic():
+        ProductRecommendation.objects.filter(product_id__in=[product_id for product_id, _ in block]).delete()
+        ProductRecommendation.objects.bulk_create([
+            ProductRecommendation(product_id=product_id, recommended_id=neighbour, rank=rank, score=score)
+            for product_id, neighbours in block if product_id in existing
+            for rank, (neighbour, score) in enumerate(
+                [(n, s) for n, s in neighbours if n in existing], start=1
+            )
+        ], batch_size=1000)
+
+
+def rebuild_recommendations():
+    """
+    Recompute the top-K neighbour table. Rows are replaced one block of
+    products at a time; products that lost all interactions are cleared at
+    the end. Returns the number of products with recommendations.
+    """
+    config = _config()
+    matrix = interaction_matrix(config['CHUNK_SIZE'], config['WEIGHTS'])
+
+    built = []
+    block = []
+    for product_id, neighbours in top_neighbours(matrix, config['TOP_K'], config['BLOCK_SIZE']):
+        built.append(product_id)
+        block.append((product_id, neighbours))
+        if len(block) >= config['BLOCK_SIZE']:
+            _write_block(block)
+            block = []
+    if block:
+        _write_block(block)
+
+    built = set(built)
+    stale = [
+        product_id
+        for product_id in ProductRecommendation.objects.values_list('product_id', flat=True).distinct().order_by()
+        if product_id not in built
+    ]
+    ProductRecommendation.objects.filter(product_id__in=stale).delete()
+    transaction.on_commit(bump_catalog_version)
+
+    return ProductRecommendation.objects.values('product_id').distinct().count()
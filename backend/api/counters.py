@@ -0,0 +1,18 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+
+def add_to_counter(model, lookup, field, delta, defaults=None):
+    """
+    Add `delta` to `field` on the `model` row matching `lookup`, creating the
+    row (with `defaults`) if there is none. `lookup` must cover a unique
+    constraint: a concurrent insert of the same row makes ours fail, and the
+    delta is then applied to the winner's row instead.
+    """
+    if model.objects.filter(**lookup).update(**{field: F(field) + delta}):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **(defaults or {}), **{field: delta})
+    except IntegrityError:
+        model.objects.filter(**lookup).update(**{field: F(field) + delta})
@@ -0,0 +1,219 @@
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min, OuterRef, Subquery
+
+from .capacity import filter_available, parse_bound
+from .counters import add_to_counter
+from .models import CatalogFacet, CatalogFacetState, Product, ProductPrice
+
+
+DEFAULT_PRICE_BUCKETS = [0, 50, 100, 250, 500, 1000]
+
+
+
+def price_bucket(price):
+    edges = getattr(settings, 'CATALOG_PRICE_BUCKETS', DEFAULT_PRICE_BUCKETS)
+    for low, high in zip(edges, edges[1:]):
+        if price < high:
+            return f"{low}-{high}"
+    return f"{edges[-1]}+"
+
+
+def _facet_keys(product, lowest_prices):
+    """
+    Facet keys ("facet:value") an active product counts towards. Price facets
+    are per time_duration and use the product's lowest active price for it.
+    """
+    if not product['active']:
+        return set()
+
+    keys = {
+        f"category:{product['category_id']}",
+        f"vendor:{product['created_by_id']}",
+        f"in_stock:{'true' if product['product_qty'] > 0 else 'false'}",
+    }
+    for duration, price in lowest_prices.items():
+        keys.add(f"price_{duration}:{price_bucket(price)}")
+    return keys
+
+
+def lowest_active_prices(product_ids):
+    """Map product_id -> {duration: lowest active price}, durations lowercased."""
+    rows = (
+        ProductPrice.objects.filter(product_id__in=product_ids, active=True)
+        .values('product_id', 'time_duration')
+        .annotate(lowest=Min('price'))
+        .order_by()
+    )
+
+    lowest_prices = defaultdict(dict)
+    for row in rows:
+        duration = row['time_duration'].strip().lower()
+        current = lowest_prices[row['product_id']].get(duration)
+        if current is None or row['lowest'] < current:
+            lowest_prices[row['product_id']][duration] = row['lowest']
+    return lowest_prices
+
+
+def current_facet_keys(product_ids):
+    products = Product.objects.filter(product_id__in=product_ids).values(
+        'product_id', 'active', 'category_id', 'created_by_id', 'product_qty'
+    )
+    lowest_prices = lowest_active_prices(product_ids)
+
+    return {
+        product['product_id']: _facet_keys(product, lowest_prices[product['product_id']])
+        for product in products
+    }
+
+
+def _scoped_keys(facet_keys):
+    """
+    (scope, key) pairs a product with `facet_keys` counts towards: the whole
+    catalog plus the slices of its category and its vendor.
+    """
+    scopes = [''] + [key for key in facet_keys if key.startswith(('category:', 'vendor:'))]
+    return {(scope, key) for scope in scopes for key in facet_keys}
+
+
+def _apply_deltas(deltas):
+    for (scope, key), delta in sorted(deltas.items()):
+        if delta:
+            facet, value = key.split(':', 1)
+            add_to_counter(CatalogFacet, {'scope': scope, 'facet': facet, 'value': value}, 'product_count', delta)
+
+
+def sync_product_facets(product_ids):
+    """
+    Bring the facet counts in line with the current state of the given
+    products. Each product's last counted facet keys are kept in
+    CatalogFacetState, so only the difference is applied and repeated calls
+    are harmless.
+    """
+    product_ids = sorted(set(product_ids))
+    if not product_ids:
+        return
+
+    with transaction.atomic():
+        states = {
+            state.product_id: state
+            for state in CatalogFacetState.objects.select_for_update().filter(product_id__in=product_ids)
+        }
+        current = current_facet_keys(product_ids)
+
+        deltas = Counter()
+        created, updated, removed = [], [], []
+        for product_id in product_ids:
+            state = states.get(product_id)
+            before = set(state.facet_keys) if state else set()
+            after = current.get(product_id, set())
+            if before == after:
+                continue
+
+            scoped_before, scoped_after = _scoped_keys(before), _scoped_keys(after)
+            for key in scoped_after - scoped_before:
+                deltas[key] += 1
+            for key in scoped_before - scoped_after:
+                deltas[key] -= 1
+
+            if not after:
+                removed.append(product_id)
+            elif state:
+                state.facet_keys = sorted(after)
+                updated.append(state)
+            else:
+                created.append(CatalogFacetState(product_id=product_id, facet_keys=sorted(after)))
+
+        _apply_deltas(deltas)
+        if created:
+            CatalogFacetState.objects.bulk_create(created)
+        if updated:
+            CatalogFacetState.objects.bulk_update(updated, ['facet_keys'])
+        if removed:
+            CatalogFacetState.objects.filter(product_id__in=removed).delete()
+
+
+def facet_counts(scope=''):
+    """Facet counts of one precomputed scope (see CatalogFacet), read in one query."""
+    facets = defaultdict(list)
+    rows = CatalogFacet.objects.filter(scope=scope, product_count__gt=0).values_list('facet', 'value', 'product_count')
+    for facet, value, count in rows:
+        facets[facet].append({"value": value, "count": count})
+    return dict(facets)
+
+
+def catalog_facets(params):
+    """
+    Facet counts to return next to a listing: the category's slice when
+    `params` filter by category, else the vendor's when they filter by
+    vendor, else the whole catalog. Other filters do not narrow the counts;
+    keeping every combination exact would cost a scan of the matching
+    products per request.
+    """
+    if params.get('category'):
+        return facet_counts(f"category:{int(params['category'])}")
+    if params.get('vendor'):
+        return facet_counts(f"vendor:{int(params['vendor'])}")
+    return facet_counts()
+
+
+def apply_catalog_filters(queryset, params, vendor_field='created_by_id'):
+    """
+    Narrow a Product (or ProductCard) queryset by the catalog filters in
+    `params`: category, vendor, in_stock, duration with
+    min_price/max_price, and available_from/available_to with an optional
+    quantity. Raises ValueError for malformed values. Price bounds apply to
+    the lowest active price for the duration, the same price the price
+    facets bucket by.
+    """
+    if params.get('category'):
+        queryset = queryset.filter(category_id=int(params['category']))
+
+    if params.get('vendor'):
+        queryset = queryset.filter(**{vendor_field: int(params['vendor'])})
+
+    in_stock = params.get('in_stock')
+    if in_stock is not None and in_stock != '':
+        if in_stock.lower() in ('true', '1'):
+            queryset = queryset.filter(product_qty__gt=0)
+        elif in_stock.lower() in ('false', '0'):
+            queryset = queryset.filter(product_qty=0)
+        else:
+            raise ValueError("in_stock must be true or false.")
+
+    min_price = params.get('min_price')
+    max_price = params.get('max_price')
+    if min_price or max_price:
+        duration = params.get('duration')
+        if not duration:
+            raise ValueError("duration is required when filtering by price.")
+
+        lowest = ProductPrice.objects.filter(
+            product_id=OuterRef('product_id'),
+            time_duration__iexact=duration.strip(),
+            active=True
+        ).order_by().values('product_id').annotate(lowest=Min('price')).values('lowest')
+        queryset = queryset.alias(lowest_price=Subquery(lowest))
+        if min_price:
+            queryset = queryset.filter(lowest_price__gte=int(min_price))
+        if max_price:
+            queryset = queryset.filter(lowest_price__lte=int(max_price))
+
+    available_from = params.get('available_from')
+    available_to = params.get('available_to')
+    if available_from or available_to:
+        if not (available_from and available_to):
+            raise ValueError("available_from and available_to must be given together.")
+        quantity = int(params.get('quantity') or 1)
+        if quantity <= 0:
+            raise ValueError("quantity must be greater than zero.")
+        queryset = filter_available(
+            queryset,
+            parse_bound(available_from, 'available_from'),
+            parse_bound(available_to, 'available_to', end=True),
+            quantity
+        )
+
+    return queryset
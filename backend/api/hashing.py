@@ -0,0 +1,154 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'WORKERS': 2,
+    'MAX_QUEUE': 32,
+    'TIMEOUT': 10,
+    'LOG_EVERY': 1000,
+}
+
+
+def _config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'PASSWORD_HASHING', {}))
+    return config
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is full; callers should answer 503."""
+
+
+def _init_worker(settings_module):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def _make_password(raw_password):
+    return hashers.make_password(raw_password)
+
+
+def _check_password(raw_password, encoded):
+    return hashers.check_password(raw_password, encoded)
+
+
+class HashingService:
+    """
+    Bounded process pool for PBKDF2 work (make_password / check_password).
+
+    Keeps the CPU-heavy hashing off the request workers. At most MAX_QUEUE
+    jobs may be submitted or running at once; beyond that HashingBusy is
+    raised instead of letting requests pile up behind the pool. A job that
+    times out keeps its slot until the pool actually finishes or drops it.
+    Counters are logged every LOG_EVERY jobs and with each rejection.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = None
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'rejected': 0,
+            'failed': 0,
+            'in_flight': 0,
+            'total_seconds': 0.0,
+        }
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                config = _config()
+                self._slots = threading.BoundedSemaphore(config['MAX_QUEUE'])
+                self._executor = ProcessPoolExecutor(
+                    max_workers=config['WORKERS'],
+                    initializer=_init_worker,
+                    initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'rental_management.settings'),),
+                )
+            return self._executor
+
+    def _run(self, func, *args):
+        if not _config()['ENABLED']:
+            return func(*args)
+
+        executor = self._get_executor()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats['rejected'] += 1
+            logger.warning("Password hashing queue is full: %s", self.stats())
+            raise HashingBusy("Password hashing queue is full. Please retry shortly.")
+
+        started = time.monotonic()
+        with self._lock:
+            self._stats['submitted'] += 1
+            self._stats['in_flight'] += 1
+        try:
+            future = executor.submit(func, *args)
+        except Exception:
+            self._finish(started)
+            raise
+        # The slot is freed when the job leaves the pool, not when the caller
+        # stops waiting, so timed-out jobs still count against MAX_QUEUE.
+        future.add_done_callback(lambda _: self._finish(started))
+
+        try:
+            result = future.result(timeout=_config()['TIMEOUT'])
+        except FutureTimeoutError:
+            future.cancel()
+            with self._lock:
+                self._stats['failed'] += 1
+            logger.warning("Password hashing timed out: %s", self.stats())
+            raise HashingBusy("Password hashing timed out. Please retry shortly.")
+        except Exception:
+            with self._lock:
+                self._stats['failed'] += 1
+            logger.exception("Password hashing failed")
+            raise
+
+        with self._lock:
+            self._stats['completed'] += 1
+            log_stats = self._stats['completed'] % _config()['LOG_EVERY'] == 0
+        if log_stats:
+            logger.info("Password hashing stats: %s", self.stats())
+        return result
+
+    def _finish(self, started):
+        self._slots.release()
+        with self._lock:
+            self._stats['in_flight'] -= 1
+            self._stats['total_seconds'] += time.monotonic() - started
+
+    def make_password(self, raw_password):
+        return self._run(_make_password, raw_password)
+
+    def check_password(self, raw_password, encoded):
+        return self._run(_check_password, raw_password, encoded)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        finished = stats['completed'] + stats['failed']
+        stats['avg_seconds'] = stats['total_seconds'] / finished if finished else 0.0
+        return stats
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+hashing_service = HashingService()
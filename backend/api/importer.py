@@ -0,0 +1,239 @@
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from .cards import refresh_product_cards
+from .catalog_cache import bump_catalog_version
+from .facets import sync_product_facets
+from .models import Category, Product, ProductPrice
+from .pricing import invalidate_tariffs
+
+
+PRICE_DURATIONS = ['hour', 'day', 'week', 'month', 'year']
+DEFAULT_CATEGORY_ID = 1
+
+DEFAULTS = {
+    'CHUNK_SIZE': 500,
+    'MAX_ERRORS': 1000,
+}
+
+
+def _config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'PRODUCT_IMPORT', {}))
+    return config
+
+
+def _decoded_lines(stream):
+    for line in stream:
+        yield line.decode('utf-8-sig') if isinstance(line, bytes) else line
+
+
+def iter_csv_rows(stream):
+    """
+    Yield (row_number, dict) from a CSV stream with a header line. Prices go
+    in price_<duration> columns, e.g. price_day.
+    """
+    reader = csv.DictReader(_decoded_lines(stream))
+    for row_number, row in enumerate(reader, start=1):
+        prices = {
+            duration: row.get(f'price_{duration}')
+            for duration in PRICE_DURATIONS
+            if row.get(f'price_{duration}') not in (None, '')
+        }
+        yield row_number, {
+            'product_name': row.get('product_name'),
+            'product_description': row.get('product_description'),
+            'product_qty': row.get('product_qty'),
+            'category_name': row.get('category_name'),
+            'prices': prices,
+        }
+
+
+def iter_ndjson_rows(stream):
+    """
+    Yield (row_number, dict) from newline-delimited JSON. Prices may be given
+    as a "prices" object ({"day": 40}) or as price_<duration> keys.
+    """
+    row_number = 0
+    for line in _decoded_lines(stream):
+        line = line.strip()
+        if not line:
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield row_number, None
+            continue
+        if not isinstance(row, dict) or not isinstance(row.get('prices') or {}, dict):
+            yield row_number, None
+            continue
+        prices = dict(row.get('prices') or {})
+        for duration in PRICE_DURATIONS:
+            if row.get(f'price_{duration}') is not None:
+                prices[duration] = row[f'price_{duration}']
+        row['prices'] = prices
+        yield row_number, row
+
+
+def _whole_number(value):
+    """int(value) for whole numbers only: no bools and no fractional floats."""
+    if isinstance(value, bool):
+        raise ValueError
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError
+        return int(value)
+    if isinstance(value, (int, str)):
+        return int(value)
+    raise ValueError
+
+
+def _validate(row):
+    if row is None:
+        return None, {"row": "Malformed row."}
+
+    errors = {}
+    name = (row.get('product_name') or '').strip()
+    if not name:
+        errors['product_name'] = "This field is required."
+    elif len(name) > 200:
+        errors['product_name'] = "Ensure this field has no more than 200 characters."
+
+    try:
+        qty = _whole_number(row.get('product_qty'))
+        if qty < 0:
+            raise ValueError
+    except (TypeError, ValueError):
+        qty = None
+        errors['product_qty'] = "A non-negative integer is required."
+
+    category_name = (row.get('category_name') or '').strip() or None
+    if category_name and len(category_name) > 50:
+        errors['category_name'] = "Ensure this field has no more than 50 characters."
+
+    prices = {}
+    for duration, value in (row.get('prices') or {}).items():
+        duration = str(duration).strip().lower()
+        if duration not in PRICE_DURATIONS:
+            errors[f'price_{duration}'] = "Invalid time duration."
+            continue
+        try:
+            price = _whole_number(value)
+            if price < 0:
+                raise ValueError
+            prices[duration] = price
+        except (TypeError, ValueError):
+            errors[f'price_{duration}'] = "A non-negative integer is required."
+
+    if errors:
+        return None, errors
+
+    return {
+        'product_name': name,
+        'product_description': row.get('product_description') or None,
+        'product_qty': qty,
+        'category_name': category_name,
+        'prices': prices,
+    }, None
+
+
+def _resolve_categories(names):
+    """Map category names to ids, creating missing ones, in at most three queries."""
+    if not names:
+        return {}
+    categories = dict(
+        Category.objects.filter(category_name__in=names).values_list('category_name', 'category_id')
+    )
+    missing = [name for name in names if name not in categories]
+    if missing:
+        Category.objects.bulk_create(
+            [Category(category_name=name) for name in missing],
+            ignore_conflicts=True
+        )
+        categories.update(
+            Category.objects.filter(category_name__in=missing).values_list('category_name', 'category_id')
+        )
+    return categories
+
+
+def _import_chunk(chunk, user):
+    categories = _resolve_categories({row['category_name'] for _, row in chunk if row['category_name']})
+
+    with transaction.atomic():
+        products = Product.objects.bulk_create([
+            Product(
+                product_name=row['product_name'],
+                product_description=row['product_description'],
+                product_qty=row['product_qty'],
+                category_id=categories.get(row['category_name'], DEFAULT_CATEGORY_ID),
+                created_by=user,
+            )
+            for _, row in chunk
+        ])
+        ProductPrice.objects.bulk_create([
+            ProductPrice(product=product, price=price, time_duration=duration)
+            for product, (_, row) in zip(products, chunk)
+            for duration, price in row['prices'].items()
+        ])
+
+        # bulk_create sends no signals, so keep the read models in step here.
+        product_ids = [product.product_id for product in products]
+        sync_product_facets(product_ids)
+        refresh_product_cards(product_ids)
+        invalidate_tariffs(product_ids)
+        transaction.on_commit(bump_catalog_version)
+
+    return len(products)
+
+
+def import_products(rows, user):
+    """
+    Validate and insert products from an iterator of (row_number, row) in
+    chunks of CHUNK_SIZE, so memory use does not depend on the input size.
+    Each chunk commits on its own; a failing row is reported and skipped.
+    Returns a report with counts and the first MAX_ERRORS row errors.
+    """
+    config = _config()
+    chunk_size, max_errors = config['CHUNK_SIZE'], config['MAX_ERRORS']
+    report = {"rows": 0, "created": 0, "failed": 0, "errors": [], "errors_truncated": False}
+
+    while True:
+        batch = list(islice(rows, chunk_size))
+        if not batch:
+            break
+
+        chunk = []
+        for row_number, raw in batch:
+            report["rows"] += 1
+            row, errors = _validate(raw)
+            if errors:
+                report["failed"] += 1
+                if len(report["errors"]) < max_errors:
+                    report["errors"].append({"row": row_number, "errors": errors})
+                else:
+                    report["errors_truncated"] = True
+            else:
+                chunk.append((row_number, row))
+
+        if chunk:
+            report["created"] += _import_chunk(chunk, user)
+
+    return report
+
+
+ROW_READERS = {
+    'text/csv': iter_csv_rows,
+    'application/x-ndjson': iter_ndjson_rows,
+    'application/ndjson': iter_ndjson_rows,
+    'application/jsonl': iter_ndjson_rows,
+}
+
+
+def row_reader(content_type):
+    """The row iterator for a request Content-Type, or None if unsupported."""
+    return ROW_READERS.get((content_type or '').split(';')[0].strip().lower())
@@ -0,0 +1,165 @@
+import random
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from .cards import refresh_product_cards
+from .catalog_cache import bump_catalog_version
+from .counters import add_to_counter
+from .models import Product, ProductLike, ProductLikeShard
+from .trending import record_activity
+
+
+DEFAULT_LIKE_SHARDS = 8
+
+
+def _add_delta(product_id, delta):
+    shard = random.randrange(getattr(settings, 'LIKE_COUNTER_SHARDS', DEFAULT_LIKE_SHARDS))
+    add_to_counter(ProductLikeShard, {'product_id': product_id, 'shard': shard}, 'delta', delta)
+
+
+def toggle_like(user, product_id):
+    """
+    Like or unlike a product for `user` and return "liked" or "unliked".
+    The count change goes to a random shard row, never to the product row.
+    """
+    with transaction.atomic():
+        deleted, _ = ProductLike.objects.filter(user=user, product_id=product_id).delete()
+        if deleted:
+            _add_delta(product_id, -1)
+            return "unliked"
+
+        try:
+            with transaction.atomic():
+                ProductLike.objects.create(user=user, product_id=product_id)
+        except IntegrityError:
+            # A concurrent request from the same user got there first.
+            return "liked"
+        _add_delta(product_id, 1)
+        return "liked"
+
+
+def like_count(product_id):
+    """Flushed likes plus pending shard deltas, in one query."""
+    product = Product.objects.filter(product_id=product_id).annotate(
+        pending=Sum('like_shards__delta')
+    ).values('likes', 'pending').first()
+    if product is None:
+        return 0
+    return product['likes'] + (product['pending'] or 0)
+
+
+def flush_like_counts(batch_size=500):
+    """
+    Fold pending shard deltas into Product.likes, batch_size products at a
+    time, and return how many products changed. Each batch locks only its
+    shard rows and writes its products with a single UPDATE.
+    """
+    flushed = 0
+    last_id = 0
+    while True:
+        product_ids = list(
+            ProductLikeShard.objects.filter(product_id__gt=last_id)
+            .order_by('product_id').values_list('product_id', flat=True).distinct()[:batch_size]
+        )
+        if not product_ids:
+            break
+        last_id = product_ids[-1]
+
+        with transaction.atomic():
+            shards = list(
+                ProductLikeShard.objects.select_for_update()
+                .filter(product_id__in=product_ids).values_list('pk', 'product_id', 'delta')
+            )
+            totals = Counter()
+            for _, product_id, delta in shards:
+                totals[product_id] += delta
+            totals = {product_id: delta for product_id, delta in totals.items() if delta}
+
+            if totals:
+                # A drifted counter must not fail the batch on the likes >= 0 check;
+                # reconcile_like_counts restores the exact value.
+                Product.objects.filter(product_id__in=totals).update(
+                    likes=Greatest(
+                        F('likes') + Case(
+                            *[When(product_id=product_id, then=Value(delta)) for product_id, delta in totals.items()],
+                            default=Value(0)
+                        ),
+                        0
+                    ),
+                    version=F('version') + 1
+                )
+                refresh_product_cards(list(totals))
+                record_activity('like', {product_id: delta for product_id, delta in totals.items() if delta > 0})
+                transaction.on_commit(bump_catalog_version)
+            ProductLikeShard.objects.filter(pk__in=[pk for pk, _, _ in shards]).delete()
+
+        flushed += len(totals)
+    return flushed
+
+
+def _expected_likes():
+    """
+    Expression for the value Product.likes should hold: the ProductLike rows
+    minus the deltas still waiting in shards.
+    """
+    likes = ProductLike.objects.filter(product_id=OuterRef('product_id')).order_by().values('product_id').annotate(
+        total=Count('pk')
+    ).values('total')
+    pending = ProductLikeShard.objects.filter(product_id=OuterRef('product_id')).order_by().values('product_id').annotate(
+        total=Sum('delta')
+    ).values('total')
+    return Greatest(
+        Coalesce(Subquery(likes, output_field=IntegerField()), 0)
+        - Coalesce(Subquery(pending, output_field=IntegerField()), 0),
+        0
+    )
+
+
+def reconcile_like_counts(batch_size=1000, dry_run=False):
+    """
+    Correct Product.likes where it has drifted from the ProductLike rows.
+    Products are scanned in id order; each batch costs one grouped COUNT
+    and one grouped SUM of pending shard deltas, and drifted rows are fixed
+    with a single UPDATE that recomputes the value in SQL, so no lock is
+    held across batches. Returns (checked, corrected).
+    """
+    checked = corrected = 0
+    last_id = 0
+    while True:
+        products = list(
+            Product.objects.filter(product_id__gt=last_id)
+            .order_by('product_id').values_list('product_id', 'likes')[:batch_size]
+        )
+        if not products:
+            break
+        last_id = products[-1][0]
+        product_ids = [product_id for product_id, _ in products]
+
+        counts = dict(
+            ProductLike.objects.filter(product_id__in=product_ids)
+            .values('product_id').annotate(total=Count('pk')).order_by().values_list('product_id', 'total')
+        )
+        pending = dict(
+            ProductLikeShard.objects.filter(product_id__in=product_ids)
+            .values('product_id').annotate(total=Sum('delta')).order_by().values_list('product_id', 'total')
+        )
+        drifted = [
+            product_id for product_id, likes in products
+            if likes != max(counts.get(product_id, 0) - (pending.get(product_id) or 0), 0)
+        ]
+
+        checked += len(products)
+        if drifted and not dry_run:
+            with transaction.atomic():
+                corrected += Product.objects.filter(product_id__in=drifted).update(
+                    likes=_expected_likes(), version=F('version') + 1
+                )
+                refresh_product_cards(drifted)
+                transaction.on_commit(bump_catalog_version)
+        else:
+            corrected += len(drifted)
+    return checked, corrected
@@ -0,0 +1,172 @@
+from abc import ABC, abstractmethod
+
+from rest_framework import serializers
+
+from .models import Order, Product, ProductCard, ProductPrice, UserData
+
+
+_datetime = serializers.DateTimeField()
+_percentage = serializers.DecimalField(max_digits=5, decimal_places=2)
+_money = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+def _datetime_value(value):
+    return _datetime.to_representation(value) if value else None
+
+
+class Listing(ABC):
+    """
+    Flat serializer for list endpoints. Each listing declares the joins its
+    rows need and builds plain dicts with the same JSON as the nested
+    ModelSerializer it stands in for, so a page costs a constant number of
+    queries whatever its size.
+    """
+    model = None
+    select_related = ()
+    prefetch_related = ()
+
+    def prepare(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset
+
+    @abstractmethod
+    def row(self, obj):
+        """The JSON-ready dict for one object."""
+
+    def many(self, rows):
+        return [self.row(obj) for obj in rows]
+
+
+class UserListing(Listing):
+    """Same output as UserDataSerializer."""
+    model = UserData
+    select_related = ('user_role',)
+
+    def row(self, user):
+        return {
+            "user_data_id": user.user_data_id,
+            "user_name": user.user_name,
+            "user_email": user.user_email,
+            "user_contact": user.user_contact,
+            "user_address": user.user_address,
+            "user_role": {
+                "user_role_id": user.user_role.user_role_id,
+                "user_role_name": user.user_role.user_role_name,
+            },
+            "active": user.active,
+            "created_at": _datetime_value(user.created_at),
+            "updated_at": _datetime_value(user.updated_at),
+        }
+
+
+class ProductListing(Listing):
+    """Same output as ProductSerializer."""
+    model = Product
+    select_related = ('category', 'created_by__user_role')
+
+    def row(self, product):
+        return {
+            "product_id": product.product_id,
+            "product_name": product.product_name,
+            "product_description": product.product_description,
+            "product_qty": product.product_qty,
+            "category": str(product.category),
+            "likes": product.likes,
+            "created_at": _datetime_value(product.created_at),
+            "created_by": user_listing.row(product.created_by),
+            "active": product.active,
+        }
+
+
+class ProductPriceListing(Listing):
+    """Same output as ProductPriceSerializer."""
+    model = ProductPrice
+    select_related = ('product__category', 'product__created_by__user_role')
+
+    def row(self, price):
+        return {
+            "product_price_id": price.product_price_id,
+            "product": product_listing.row(price.product),
+            "price": price.price,
+            "time_duration": price.time_duration,
+            "active": price.active,
+        }
+
+
+class OrderListing(Listing):
+    """Same output as OrderSerializer."""
+    model = Order
+    select_related = (
+        'product__category', 'product__created_by__user_role',
+        'user_data__user_role',
+        'payment__invoice_type', 'payment__status',
+        'status',
+    )
+
+    def row(self, order):
+        payment = order.payment
+        return {
+            "order_id": order.order_id,
+            "product": product_listing.row(order.product),
+            "user_data": user_listing.row(order.user_data),
+            "payment": {
+                "payment_id": payment.payment_id,
+                "invoice_type": {
+                    "invoice_type_id": payment.invoice_type.invoice_type_id,
+                    "invoice_type": payment.invoice_type.invoice_type,
+                },
+                "status": {
+                    "status_id": payment.status.status_id,
+                    "status_name": payment.status.status_name,
+                },
+                "payment_percentage": _percentage.to_representation(payment.payment_percentage),
+                "active": payment.active,
+                "created_at": _datetime_value(payment.created_at),
+            },
+            "status": {
+                "status_id": order.status.status_id,
+                "status_name": order.status.status_name,
+            },
+            "timestamp_from": _datetime_value(order.timestamp_from),
+            "timestamp_to": _datetime_value(order.timestamp_to),
+            "created_at": _datetime_value(order.created_at),
+            "quantity": order.quantity,
+            "total_price": _money.to_representation(order.total_price) if order.total_price is not None else None,
+        }
+
+
+class ProductCardListing(Listing):
+    """Compact product cards read from the denormalized product_card table."""
+    model = ProductCard
+
+    def row(self, card):
+        return {
+            "product_id": card.product_id,
+            "product_name": card.product_name,
+            "product_description": card.product_description,
+            "product_qty": card.product_qty,
+            "category_id": card.category_id,
+            "category": card.category_name,
+            "vendor_id": card.vendor_id,
+            "vendor_name": card.vendor_name,
+            "likes": card.likes,
+            "prices": {
+                "hour": card.price_hour,
+                "day": card.price_day,
+                "week": card.price_week,
+                "month": card.price_month,
+                "year": card.price_year,
+            },
+            "active": card.active,
+            "created_at": _datetime_value(card.created_at),
+        }
+
+
+user_listing = UserListing()
+product_listing = ProductListing()
+product_price_listing = ProductPriceListing()
+order_listing = OrderListing()
+product_card_listing = ProductCardListing()
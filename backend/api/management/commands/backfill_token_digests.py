@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.models import UserAccessToken
+
+
+class Command(BaseCommand):
+    help = "Fill user_access_token_digest for tokens stored before digest mode was enabled."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--clear-tokens',
+            action='store_true',
+            help="Also drop the raw JWT from rows once their digest is stored.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        clear_tokens = options['clear_tokens']
+        fields = ['user_access_token_digest'] + (['user_access_token'] if clear_tokens else [])
+
+        last_id = 0
+        updated = 0
+        while True:
+            batch = list(
+                UserAccessToken.objects.filter(
+                    user_access_token_id__gt=last_id,
+                    user_access_token__isnull=False,
+                )
+                .order_by('user_access_token_id')
+                .only('user_access_token_id', 'user_access_token', 'user_access_token_digest')[:batch_size]
+            )
+            if not batch:
+                break
+
+            for access_token in batch:
+                access_token.user_access_token_digest = UserAccessToken.make_digest(access_token.user_access_token)
+                if clear_tokens:
+                    access_token.user_access_token = None
+
+            with transaction.atomic():
+                UserAccessToken.objects.bulk_update(batch, fields)
+
+            updated += len(batch)
+            last_id = batch[-1].user_access_token_id
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled digests for {updated} tokens."))
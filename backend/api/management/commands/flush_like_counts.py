@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.likes import flush_like_counts
+
+
+class Command(BaseCommand):
+    help = "Fold pending like shard deltas into Product.likes. Run periodically, e.g. every minute from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        flushed = flush_like_counts(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Flushed like counts for {flushed} products."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.capacity import rebuild_day_reservations
+
+
+class Command(BaseCommand):
+    help = "Recompute the product_day_reservation availability index from orders."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rows = rebuild_day_reservations(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {rows} product days."))
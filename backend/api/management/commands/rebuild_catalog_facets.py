@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.facets import sync_product_facets
+from api.models import CatalogFacet, CatalogFacetState, Product
+
+
+class Command(BaseCommand):
+    help = "Recompute the precomputed catalog facet counts from scratch."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        with transaction.atomic():
+            CatalogFacet.objects.all().delete()
+            CatalogFacetState.objects.all().delete()
+
+        last_id = 0
+        synced = 0
+        while True:
+            product_ids = list(
+                Product.objects.filter(product_id__gt=last_id)
+                .order_by('product_id')
+                .values_list('product_id', flat=True)[:batch_size]
+            )
+            if not product_ids:
+                break
+            sync_product_facets(product_ids)
+            synced += len(product_ids)
+            last_id = product_ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt catalog facets for {synced} products."))
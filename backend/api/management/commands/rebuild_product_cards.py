@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from api.cards import refresh_product_cards
+from api.models import Product, ProductCard
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized product_card table from products, prices, categories and vendors."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        deleted, _ = ProductCard.objects.exclude(
+            product_id__in=Product.objects.values('product_id')
+        ).delete()
+
+        last_id = 0
+        refreshed = 0
+        while True:
+            product_ids = list(
+                Product.objects.filter(product_id__gt=last_id)
+                .order_by('product_id')
+                .values_list('product_id', flat=True)[:batch_size]
+            )
+            if not product_ids:
+                break
+            refresh_product_cards(product_ids)
+            refreshed += len(product_ids)
+            last_id = product_ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {refreshed} product cards, removed {deleted} orphaned cards."
+        ))
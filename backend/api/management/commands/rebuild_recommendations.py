@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.cooccurrence import rebuild_recommendations
+
+
+class Command(BaseCommand):
+    help = "Rebuild the \"customers also rented\" table from order, wishlist and like co-occurrence."
+
+    def handle(self, *args, **options):
+        built = rebuild_recommendations()
+        self.stdout.write(self.style.SUCCESS(f"Built recommendations for {built} products."))
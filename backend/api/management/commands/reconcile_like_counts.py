@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from api.likes import reconcile_like_counts
+
+
+class Command(BaseCommand):
+    help = "Recount Product.likes from ProductLike rows and fix counters that have drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help="Report drifted counters without fixing them.")
+
+    def handle(self, *args, **options):
+        checked, corrected = reconcile_like_counts(
+            batch_size=options['batch_size'], dry_run=options['dry_run']
+        )
+        verb = "would correct" if options['dry_run'] else "corrected"
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} products, {verb} {corrected}."))
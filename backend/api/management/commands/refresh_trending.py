@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.trending import refresh_trending
+
+
+class Command(BaseCommand):
+    help = "Recompute the product_trending ranking from recent likes, wishlist adds and completed orders."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        ranked = refresh_trending(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Ranked {ranked} trending products."))
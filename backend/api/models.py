@@ -1,8 +1,23 @@
 from datetime import timedelta
 from django.utils import timezone
+import hashlib
 import uuid
+from django.conf import settings
 from django.db import models
-from django.contrib.auth.hashers import make_password
+from .hashing import hashing_service
+
+def bump_version(instance, save_kwargs):
+    """
+    Increment the row version on every update, in SQL so concurrent writers
+    never end up on the same version. Used as a cheap ETag validator.
+    """
+    if instance._state.adding or save_kwargs.get('force_insert'):
+        return
+    instance.version = models.F('version') + 1
+    update_fields = save_kwargs.get('update_fields')
+    if update_fields is not None:
+        save_kwargs['update_fields'] = set(update_fields) | {'version'}
+
 
 class UserRole(models.Model):
     user_role_id = models.BigAutoField(primary_key=True)
@@ -31,7 +46,7 @@ class UserData(models.Model):
 
     def save(self, *args, **kwargs):
         if self.user_password and not self.user_password.startswith('pbkdf2_'):
-            self.user_password = make_password(self.user_password)
+            self.user_password = hashing_service.make_password(self.user_password)
         super().save(*args, **kwargs)
 
     class Meta:
@@ -69,10 +84,20 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(UserData, on_delete=models.CASCADE, related_name='products')
     active = models.BooleanField(default=True)
+    version = models.PositiveIntegerField(default=1)
+
+    def save(self, *args, **kwargs):
+        bump_version(self, kwargs)
+        super().save(*args, **kwargs)
 
     class Meta:
         db_table = 'product'
         ordering = ['product_name']
+        indexes = [
+            models.Index(fields=['active', 'product_id']),
+            models.Index(fields=['created_by', 'product_id']),
+            models.Index(fields=['category', 'product_id']),
+        ]
 
     def __str__(self):
         return self.product_name
@@ -88,6 +113,10 @@ class ProductPrice(models.Model):
     class Meta:
         db_table = 'product_price'
         ordering = ['-price']
+        indexes = [
+            models.Index(fields=['product', 'product_price_id']),
+            models.Index(fields=['time_duration', 'price']),
+        ]
 
     def __str__(self):
         return f"{self.product.product_name} - {self.price} / {self.time_duration}"
@@ -142,11 +171,23 @@ class Order(models.Model):
     quantity = models.PositiveIntegerField(default=1)  # Add this line
     timestamp_from = models.DateTimeField()
     timestamp_to = models.DateTimeField()
+    # Rental total from api.pricing at the time the order was placed.
+    total_price = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    version = models.PositiveIntegerField(default=1)
+
+    def save(self, *args, **kwargs):
+        bump_version(self, kwargs)
+        super().save(*args, **kwargs)
 
     class Meta:
         db_table = 'orders' 
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user_data', '-created_at', '-order_id']),
+            models.Index(fields=['-created_at', '-order_id']),
+            models.Index(fields=['product', 'timestamp_to']),
+        ]
 
     def __str__(self):
         return f"Order #{self.order_id} ({self.status.status_name})"
@@ -169,15 +210,43 @@ class Notification(models.Model):
         return f"Notification #{self.notification_id} for {self.user_data.user_name}"
 
 
+class UserAccessTokenQuerySet(models.QuerySet):
+    def for_token(self, token):
+        """
+        Filter by raw token. In 'digest' storage mode the lookup goes through
+        the fixed-size digest index; FALLBACK also matches rows written before
+        the digest column was backfilled.
+        """
+        storage = getattr(settings, 'ACCESS_TOKEN_STORAGE', {})
+        if storage.get('MODE', 'full') != 'digest':
+            return self.filter(user_access_token=token)
+
+        lookup = models.Q(user_access_token_digest=UserAccessToken.make_digest(token))
+        if storage.get('FALLBACK', True):
+            lookup |= models.Q(user_access_token_digest__isnull=True, user_access_token=token)
+        return self.filter(lookup)
+
+    def create_for_token(self, token, **kwargs):
+        storage = getattr(settings, 'ACCESS_TOKEN_STORAGE', {})
+        if storage.get('MODE', 'full') == 'digest':
+            kwargs['user_access_token_digest'] = UserAccessToken.make_digest(token)
+        else:
+            kwargs['user_access_token'] = token
+        return self.create(**kwargs)
+
+
 class UserAccessToken(models.Model):
     user_access_token_id = models.BigAutoField(primary_key=True)
     user_data = models.ForeignKey(UserData, on_delete=models.CASCADE, related_name='access_tokens')
-    user_access_token = models.CharField(max_length=255, unique=True, db_index=True)
+    user_access_token = models.CharField(max_length=255, unique=True, db_index=True, blank=True, null=True)
+    user_access_token_digest = models.CharField(max_length=64, unique=True, blank=True, null=True)
     user_access_token_expiry = models.DateTimeField()
     last_used_at = models.DateTimeField(blank=True, null=True)
     active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = UserAccessTokenQuerySet.as_manager()
+
     class Meta:
         db_table = 'user_access_token'
         ordering = ['-created_at']
@@ -185,6 +254,14 @@ class UserAccessToken(models.Model):
     def __str__(self):
         return f"Token #{self.user_access_token_id} for {self.user_data.user_name}"
 
+    @staticmethod
+    def make_digest(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    @property
+    def digest(self):
+        return self.user_access_token_digest or self.make_digest(self.user_access_token)
+
 
 class Delivery(models.Model):
     delivery_id = models.BigAutoField(primary_key=True)
@@ -216,6 +293,26 @@ class ProductLike(models.Model):
         return f"{self.user} liked {self.product}"
 
 
+class ProductLikeShard(models.Model):
+    """
+    Pending like deltas for a product, spread over a few shard rows so
+    concurrent likes do not contend on one row. flush_like_counts() folds
+    them into Product.likes.
+    """
+    product_like_shard_id = models.BigAutoField(primary_key=True)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='like_shards')
+    shard = models.PositiveSmallIntegerField()
+    delta = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'product_like_shard'
+        ordering = ['product_id', 'shard']
+        unique_together = ('product', 'shard')
+
+    def __str__(self):
+        return f"{self.product_id}/{self.shard}: {self.delta:+d}"
+
+
 class Wishlist(models.Model):
     wishlist_id = models.BigAutoField(primary_key=True)
     user = models.ForeignKey(UserData, on_delete=models.CASCADE, related_name='wishlist_items')
@@ -262,3 +359,145 @@ class Cart(models.Model):
 
     def __str__(self):
         return f"{self.user.user_name} - {self.product.product_name} ({self.quantity})"
+
+
+class CatalogFacet(models.Model):
+    """
+    Product count per facet value. `scope` is '' for the whole catalog or a
+    "category:<id>" / "vendor:<id>" slice, so listings filtered by category
+    or vendor read their counts directly.
+    """
+    catalog_facet_id = models.BigAutoField(primary_key=True)
+    scope = models.CharField(max_length=60, default='', blank=True)
+    facet = models.CharField(max_length=50)
+    value = models.CharField(max_length=100)
+    product_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'catalog_facet'
+        unique_together = ('scope', 'facet', 'value')
+        ordering = ['scope', 'facet', 'value']
+
+    def __str__(self):
+        return f"{self.scope or 'catalog'} {self.facet}={self.value} ({self.product_count})"
+
+
+class CatalogFacetState(models.Model):
+    # Plain id rather than a FK: the state must outlive the product row so a
+    # delete can still subtract what the product used to count towards.
+    product_id = models.BigIntegerField(primary_key=True)
+    facet_keys = models.JSONField(default=list)
+
+    class Meta:
+        db_table = 'catalog_facet_state'
+
+    def __str__(self):
+        return f"Facets for product #{self.product_id}"
+
+
+class ProductCard(models.Model):
+    """
+    Denormalized read model for catalog listing pages: everything a product
+    card shows in one row, kept current by api.cards from product, price,
+    category, vendor and like writes.
+    """
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='card'
+    )
+    product_name = models.CharField(max_length=200)
+    product_description = models.TextField(blank=True, null=True)
+    product_qty = models.PositiveIntegerField()
+    category_id = models.BigIntegerField(blank=True, null=True)
+    category_name = models.CharField(max_length=50, blank=True, null=True)
+    vendor_id = models.BigIntegerField()
+    vendor_name = models.CharField(max_length=100)
+    likes = models.PositiveIntegerField(default=0)
+    price_hour = models.PositiveIntegerField(blank=True, null=True)
+    price_day = models.PositiveIntegerField(blank=True, null=True)
+    price_week = models.PositiveIntegerField(blank=True, null=True)
+    price_month = models.PositiveIntegerField(blank=True, null=True)
+    price_year = models.PositiveIntegerField(blank=True, null=True)
+    active = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'product_card'
+        ordering = ['product_id']
+        indexes = [
+            models.Index(fields=['active', 'product_id']),
+            models.Index(fields=['category_id', 'product_id']),
+            models.Index(fields=['vendor_id', 'product_id']),
+        ]
+
+    def __str__(self):
+        return f"Card for {self.product_name}"
+
+
+class ProductTrending(models.Model):
+    """
+    Precomputed trending score per product: time-decayed likes, wishlist
+    adds and completed orders, maintained by api.trending. Scores are
+    relative to `anchored_at`, which every row shares after a refresh.
+    """
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending'
+    )
+    score = models.FloatField(default=0)
+    anchored_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'product_trending'
+        ordering = ['-score', 'product_id']
+        indexes = [
+            models.Index(fields=['-score', 'product']),
+            models.Index(fields=['-anchored_at']),
+        ]
+
+    def __str__(self):
+        return f"Trending #{self.product_id}: {self.score:.2f}"
+
+
+class ProductRecommendation(models.Model):
+    """
+    "Customers also rented" neighbours of a product, ranked by co-occurrence
+    in orders, wishlists and likes of the same users. Rebuilt offline by
+    `manage.py rebuild_recommendations`.
+    """
+    product_recommendation_id = models.BigAutoField(primary_key=True)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='recommendations')
+    recommended = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='recommended_by')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        db_table = 'product_recommendation'
+        ordering = ['product_id', 'rank']
+        unique_together = ('product', 'rank')
+
+    def __str__(self):
+        return f"#{self.product_id} -> #{self.recommended_id} ({self.rank})"
+
+
+class ProductDayReservation(models.Model):
+    """
+    Units of a product held by orders on each calendar day, kept up to date
+    by api.capacity as orders change. Backs the catalog availability filter.
+    """
+    product_day_reservation_id = models.BigAutoField(primary_key=True)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='day_reservations')
+    day = models.DateField()
+    reserved = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'product_day_reservation'
+        ordering = ['product_id', 'day']
+        unique_together = ('product', 'day')
+
+    def __str__(self):
+        return f"#{self.product_id} {self.day}: {self.reserved}"
@@ -0,0 +1,67 @@
+import json
+
+from django.db import connections
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over an indexed sort key. Pages are fetched with
+    `WHERE key > last_seen ORDER BY key LIMIT n` instead of OFFSET, and the
+    next/previous links carry an opaque cursor rather than a page number.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def __init__(self, ordering, page_size=10):
+        self.ordering = ordering
+        self.page_size = page_size
+
+
+def is_cursor_request(request):
+    """Cursor mode is opt-in: ?pagination=cursor, or any request carrying a cursor."""
+    return request.GET.get('pagination') == 'cursor' or 'cursor' in request.GET
+
+
+def approximate_count(queryset):
+    """
+    Row estimate from the PostgreSQL planner, which costs no table scan.
+    Other backends fall back to an exact COUNT(*).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def cursor_paginate(request, queryset, ordering, serialize, page_size=10):
+    """
+    Paginate `queryset` by `ordering` and return the response `data` payload.
+
+    `serialize` turns the page (a list of rows) into JSON-ready data. The total
+    is omitted unless asked for with ?total=exact or ?total=approx.
+    """
+    paginator = KeysetPagination(ordering, page_size)
+    page = paginator.paginate_queryset(queryset, request)
+
+    data = {
+        "results": serialize(page),
+        "page_size": paginator.page_size,
+        "next": paginator.get_next_link(),
+        "previous": paginator.get_previous_link()
+    }
+
+    total = request.GET.get('total')
+    if total == 'exact':
+        data["total_items"] = queryset.count()
+    elif total == 'approx':
+        data["total_items"] = approximate_count(queryset)
+
+    return data
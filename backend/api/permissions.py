@@ -1,5 +1,5 @@
 from rest_framework import permissions
-from .models import UserAccessToken
+from .authentication import get_auth_context
 from functools import wraps
 from django.http import JsonResponse
 from rest_framework import status as drf_status
@@ -12,21 +12,10 @@ class IsOwner(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
         # Ensure the user is authenticated via your token system
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        token = auth_header.split(' ')[1] if ' ' in auth_header else None
-        if not token:
+        current_user = get_auth_context(request).user
+        if current_user is None:
             return False
 
-        try:
-            access_token = UserAccessToken.objects.get(
-                user_access_token=token,
-                active=True
-            )
-        except UserAccessToken.DoesNotExist:
-            return False
-
-        current_user = access_token.user_data
-
         # Check if the object has a 'user_data' field (direct owner)
         if hasattr(obj, 'user_data'):
             return obj.user_data == current_user
@@ -42,17 +31,38 @@ class IsOwner(permissions.BasePermission):
         return False
 
 
+def get_user_role(request):
+    """
+    Lowercased role name of the authenticated user. The token's role claim
+    is used only while it still matches the user's current user_role_id, so
+    a role change takes effect at once; otherwise, and for tokens minted
+    before roles were embedded, the user's user_role relation decides.
+    """
+    user = getattr(request, 'user', None)
+    claims = getattr(request, 'auth', None)
+    if isinstance(claims, dict) and claims.get('role') and user is not None:
+        if (
+            claims.get('user_id') == str(getattr(user, 'user_data_id', ''))
+            and claims.get('role_id') == getattr(user, 'user_role_id', None)
+        ):
+            return claims['role']
+
+    if not user or not hasattr(user, 'user_role') or not user.user_role:
+        return None
+    return user.user_role.user_role_name.lower()
+
+
 def role_required(allowed_roles):
     def decorator(view_func):
         @wraps(view_func)
         def _wrapped_view(request, *args, **kwargs):
-            user = request.user
-            if not user or not hasattr(user, 'user_role') or not user.user_role:
+            role = get_user_role(request)
+            if not role:
                 return JsonResponse(
                     {"isSuccess": False, "error": "User role not found."},
                     status=drf_status.HTTP_403_FORBIDDEN
                 )
-            if user.user_role.user_role_name.lower() not in allowed_roles:
+            if role not in allowed_roles:
                 return JsonResponse(
                     {"isSuccess": False, "error": "Access denied: insufficient role permissions."},
                     status=drf_status.HTTP_403_FORBIDDEN
@@ -74,10 +84,7 @@ class IsVendor(permissions.BasePermission):
     Allows access only to users with 'vendor' role.
     """
     def has_permission(self, request, view):
-        user = request.user
-        if not user or not hasattr(user, 'user_role') or not user.user_role:
-            return False
-        return user.user_role.user_role_name.lower() == 'vendor'
+        return get_user_role(request) == 'vendor'
 
 
 class IsCustomer(permissions.BasePermission):
@@ -85,7 +92,4 @@ class IsCustomer(permissions.BasePermission):
     Allows access only to users with 'customer' role.
     """
     def has_permission(self, request, view):
-        user = request.user
-        if not user or not hasattr(user, 'user_role') or not user.user_role:
-            return False
-        return user.user_role.user_role_name.lower() == 'customer'
+        return get_user_role(request) == 'customer'
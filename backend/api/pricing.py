@@ -0,0 +1,232 @@
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import make_aware
+
+from .models import ProductPrice
+
+
+# Tariff units in the order rentals are charged by, with their length in hours.
+TARIFF_HOURS = {
+    'hour': 1,
+    'day': 24,
+    'week': 24 * 7,
+    'month': 24 * 30,
+    'year': 24 * 365,
+}
+TARIFF_ORDER = list(TARIFF_HOURS)
+
+DEFAULTS = {
+    'TTL': 600,
+    'LOCAL_TTL': 10,
+    'BACKEND': 'default',
+}
+
+# Backends whose entries live in one process, out of reach of other workers' invalidations.
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def _config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'TARIFF_CACHE', {}))
+    return config
+
+
+def _cache():
+    return caches[_config()['BACKEND']]
+
+
+def _ttl(cache):
+    """
+    TTL for cached tables. A price write invalidates only the shared backend
+    and its own process, so with a process-local backend other workers may
+    price at old rates until the entry expires; cap that at LOCAL_TTL.
+    """
+    config = _config()
+    if isinstance(cache, PROCESS_LOCAL_BACKENDS):
+        return min(config['TTL'], config['LOCAL_TTL'])
+    return config['TTL']
+
+
+def _key(product_id):
+    return f"tariff:{product_id}"
+
+
+def compile_tariffs(product_ids):
+    """
+    Build the tariff table of each product from the database in one query:
+    {duration: rate} over its active prices, the highest rate when a
+    duration is listed more than once. Products without prices get {}.
+    """
+    tables = {product_id: {} for product_id in product_ids}
+    rows = ProductPrice.objects.filter(
+        product_id__in=tables, active=True
+    ).values_list('product_id', 'time_duration', 'price')
+
+    for product_id, duration, price in rows:
+        duration = duration.lower()
+        if duration in TARIFF_HOURS and price > tables[product_id].get(duration, -1):
+            tables[product_id][duration] = price
+    return tables
+
+
+def tariff_tables(product_ids):
+    """
+    Compiled tariff tables for `product_ids`, served from the tariff cache.
+    Misses are compiled together and cached; ProductPrice writes invalidate
+    the affected products through invalidate_tariffs().
+    """
+    product_ids = set(product_ids)
+    if not product_ids:
+        return {}
+
+    cache = _cache()
+    keys = {_key(product_id): product_id for product_id in product_ids}
+    tables = {keys[key]: table for key, table in cache.get_many(list(keys)).items()}
+
+    missing = product_ids - set(tables)
+    if missing:
+        compiled = compile_tariffs(missing)
+        cache.set_many({_key(product_id): table for product_id, table in compiled.items()}, timeout=_ttl(cache))
+        tables.update(compiled)
+    return tables
+
+
+def invalidate_tariffs(product_ids):
+    """Drop cached tariff tables now and again once the current transaction commits."""
+    keys = [_key(product_id) for product_id in set(product_ids)]
+    if not keys:
+        return
+    cache = _cache()
+    cache.delete_many(keys)
+    # A reader may re-cache the old prices before the write commits.
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def charged_tariff(table):
+    """The (rate, unit_hours) a rental is charged at: the first unit in TARIFF_ORDER with a rate."""
+    for duration in TARIFF_ORDER:
+        if duration in table:
+            return table[duration], TARIFF_HOURS[duration]
+    return None
+
+
+def load_tariffs(product_ids):
+    """Map product_id -> (rate, unit_hours) for every product that has a tariff."""
+    return {
+        product_id: tariff
+        for product_id, tariff in (
+            (product_id, charged_tariff(table)) for product_id, table in tariff_tables(product_ids).items()
+        )
+        if tariff is not None
+    }
+
+
+def price_items(items, tariffs=None):
+    """
+    Rental totals for `items`, a sequence of (product_id, timestamp_from,
+    timestamp_to, quantity), computed for the whole batch at once as
+    rate * (hours / unit_hours) * quantity and rounded to cents. Items with
+    an empty or inverted range, or a product without a tariff, cost 0.
+    """
+    items = list(items)
+    if tariffs is None:
+        tariffs = load_tariffs(product_id for product_id, _, _, _ in items)
+
+    count = len(items)
+    rates = np.zeros(count)
+    unit_hours = np.ones(count)
+    seconds = np.zeros(count)
+    quantities = np.ones(count)
+    priced = np.zeros(count, dtype=bool)
+
+    for i, (product_id, start, end, quantity) in enumerate(items):
+        tariff = tariffs.get(product_id)
+        if tariff is None or not start or not end or start >= end:
+            continue
+        priced[i] = True
+        rates[i], unit_hours[i] = tariff
+        seconds[i] = (end - start).total_seconds()
+        quantities[i] = quantity or 1
+
+    # Same operation order as the scalar formula, so the floats match exactly.
+    totals = rates * (seconds / 3600 / unit_hours) * quantities
+
+    # Python's round() rather than np.round(), which can differ in the last cent.
+    return [round(float(total), 2) if is_priced else 0 for total, is_priced in zip(totals, priced)]
+
+
+def to_money(amount):
+    """A price_items() amount as a two-place Decimal for storage."""
+    return Decimal(str(amount)).quantize(Decimal('0.01'))
+
+
+MAX_QUOTE_ITEMS = 5000
+
+
+class QuoteError(Exception):
+    pass
+
+
+def _parse_int(value, message):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(message)
+
+
+def _parse_timestamp(value):
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        raise ValueError("Invalid datetime format. Use ISO 8601 format like 2025-08-15T10:00:00Z.")
+    return make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def quote(items):
+    """
+    Price a batch of {product_id, timestamp_from, timestamp_to, quantity}
+    requests in one pass over the cached tariff tables. Returns one result
+    per item, in order: the price, or an error for that item alone.
+    """
+    if not isinstance(items, list) or not items:
+        raise QuoteError("Expected a non-empty list of items.")
+    if len(items) > MAX_QUOTE_ITEMS:
+        raise QuoteError(f"At most {MAX_QUOTE_ITEMS} items per request.")
+
+    parsed, errors = [], {}
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError("An object is required.")
+            product_id = _parse_int(item.get('product_id'), "product_id must be an integer.")
+            quantity = _parse_int(item.get('quantity', 1), "Quantity must be an integer.")
+            if quantity <= 0:
+                raise ValueError("Quantity must be greater than zero.")
+            start = _parse_timestamp(item.get('timestamp_from'))
+            end = _parse_timestamp(item.get('timestamp_to'))
+            if start >= end:
+                raise ValueError("timestamp_to must be after timestamp_from.")
+        except ValueError as e:
+            errors[index] = str(e)
+            continue
+        parsed.append((index, (product_id, start, end, quantity)))
+
+    tariffs = load_tariffs(product_id for _, (product_id, _, _, _) in parsed)
+    prices = price_items([item for _, item in parsed], tariffs)
+
+    results = [None] * len(items)
+    for index, error in errors.items():
+        results[index] = {"error": error}
+    for (index, (product_id, _, _, quantity)), price in zip(parsed, prices):
+        if product_id in tariffs:
+            results[index] = {"product_id": product_id, "quantity": quantity, "price": price}
+        else:
+            results[index] = {"product_id": product_id, "error": "No active price for this product."}
+    return results
@@ -0,0 +1,131 @@
+from django.db import transaction
+
+from .cards import refresh_product_cards
+from .catalog_cache import bump_catalog_version
+from .facets import sync_product_facets
+from .importer import PRICE_DURATIONS
+from .models import Product, ProductPrice
+from .pricing import invalidate_tariffs
+
+
+MAX_ITEMS = 5000
+BATCH_SIZE = 500
+
+
+class PriceUpsertError(Exception):
+    def __init__(self, errors):
+        super().__init__("Invalid price upsert.")
+        self.errors = errors
+
+
+def _parse_items(items, product_id=None):
+    """
+    Normalize upsert items to {(product_id, duration): (price, active)}.
+    Later items win over earlier ones with the same key.
+    """
+    if not isinstance(items, list) or not items:
+        raise PriceUpsertError([{"index": None, "errors": {"prices": "A non-empty list is required."}}])
+    if len(items) > MAX_ITEMS:
+        raise PriceUpsertError([{"index": None, "errors": {"prices": f"At most {MAX_ITEMS} items per request."}}])
+
+    wanted, errors = {}, []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({"index": index, "errors": {"item": "An object is required."}})
+            continue
+
+        item_errors = {}
+        try:
+            item_product_id = int(product_id or item.get('product_id'))
+        except (TypeError, ValueError):
+            item_errors['product_id'] = "A valid integer is required."
+
+        duration = str(item.get('time_duration') or '').strip().lower()
+        if duration not in PRICE_DURATIONS:
+            item_errors['time_duration'] = "Invalid or missing time duration."
+
+        try:
+            price = int(item.get('price'))
+            if price < 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            item_errors['price'] = "A non-negative integer is required."
+
+        active = item.get('active', True)
+        if not isinstance(active, bool):
+            item_errors['active'] = "Must be a boolean."
+
+        if item_errors:
+            errors.append({"index": index, "errors": item_errors})
+        else:
+            wanted[(item_product_id, duration)] = (price, active)
+
+    if errors:
+        raise PriceUpsertError(errors)
+    return wanted
+
+
+def upsert_prices(items, vendor, product_id=None):
+    """
+    Set ProductPrice rows keyed on (product, time_duration) for products owned
+    by `vendor`. Existing rows are matched case-insensitively on the duration
+    and updated in place; missing ones are created. Everything runs in one
+    transaction as a handful of set-based statements, independent of the
+    number of items. Raises PriceUpsertError without writing anything if any
+    item is invalid or targets another vendor's product.
+    """
+    wanted = _parse_items(items, product_id)
+    product_ids = sorted({key[0] for key in wanted})
+
+    with transaction.atomic():
+        owned = set(
+            Product.objects.select_for_update()
+            .filter(product_id__in=product_ids, created_by=vendor)
+            .values_list('product_id', flat=True)
+        )
+        foreign = [pid for pid in product_ids if pid not in owned]
+        if foreign:
+            raise PriceUpsertError([
+                {"index": None, "errors": {"product_id": f"Invalid product ID {pid}."}} for pid in foreign
+            ])
+
+        existing = ProductPrice.objects.filter(product_id__in=product_ids).only(
+            'product_price_id', 'product_id', 'time_duration', 'price', 'active'
+        )
+
+        matched, changed, unchanged = set(), [], 0
+        for row in existing:
+            key = (row.product_id, row.time_duration.strip().lower())
+            if key not in wanted:
+                continue
+            matched.add(key)
+            price, active = wanted[key]
+            if row.price == price and row.active == active:
+                unchanged += 1
+                continue
+            row.price, row.active = price, active
+            changed.append(row)
+
+        created = [
+            ProductPrice(product_id=key[0], time_duration=key[1], price=price, active=active)
+            for key, (price, active) in wanted.items()
+            if key not in matched
+        ]
+
+        ProductPrice.objects.bulk_update(changed, ['price', 'active'], batch_size=BATCH_SIZE)
+        ProductPrice.objects.bulk_create(created, batch_size=BATCH_SIZE)
+
+        # Bulk writes send no signals, so keep the read models in step here.
+        if changed or created:
+            touched = sorted({row.product_id for row in changed} | {row.product_id for row in created})
+            sync_product_facets(touched)
+            refresh_product_cards(touched)
+            invalidate_tariffs(touched)
+            transaction.on_commit(bump_catalog_version)
+
+    return {
+        "products": len(product_ids),
+        "created": len(created),
+        "updated": len(changed),
+        "unchanged": unchanged,
+    }
@@ -0,0 +1,182 @@
+import base64
+import json
+import re
+
+from django.db import connections
+from rest_framework.utils.urls import replace_query_param
+
+
+SQLITE_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS product_fts USING fts5(
+        product_name, product_description,
+        content='product', content_rowid='product_id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_fts_insert AFTER INSERT ON product BEGIN
+        INSERT INTO product_fts(rowid, product_name, product_description)
+        VALUES (new.product_id, new.product_name, new.product_description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_fts_delete AFTER DELETE ON product BEGIN
+        INSERT INTO product_fts(product_fts, rowid, product_name, product_description)
+        VALUES ('delete', old.product_id, old.product_name, old.product_description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_fts_update AFTER UPDATE OF product_name, product_description ON product BEGIN
+        INSERT INTO product_fts(product_fts, rowid, product_name, product_description)
+        VALUES ('delete', old.product_id, old.product_name, old.product_description);
+        INSERT INTO product_fts(rowid, product_name, product_description)
+        VALUES (new.product_id, new.product_name, new.product_description);
+    END
+    """,
+]
+
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(product_name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(product_description, '')), 'B')"
+)
+
+POSTGRES_SCHEMA = [
+    f"CREATE INDEX IF NOT EXISTS product_search_idx ON product USING GIN (({POSTGRES_DOCUMENT}))",
+]
+
+# Name matches weigh more than description matches on both backends.
+SQLITE_QUERY = """
+    SELECT s.product_id, s.score FROM (
+        SELECT rowid AS product_id, -bm25(product_fts, 2.0, 1.0) AS score
+        FROM product_fts WHERE product_fts MATCH %s
+    ) s
+    JOIN product p ON p.product_id = s.product_id
+    WHERE p.active {after}
+    ORDER BY s.score DESC, s.product_id ASC
+    LIMIT %s
+"""
+
+POSTGRES_QUERY = f"""
+    SELECT s.product_id, s.score FROM (
+        SELECT product_id, ts_rank({POSTGRES_DOCUMENT}, query)::float8 AS score
+        FROM product, websearch_to_tsquery('english', %s) query
+        WHERE active AND {POSTGRES_DOCUMENT} @@ query
+    ) s
+    WHERE TRUE {{after}}
+    ORDER BY s.score DESC, s.product_id ASC
+    LIMIT %s
+"""
+
+AFTER_CURSOR = "AND (s.score < %s OR (s.score = %s AND s.product_id > %s))"
+
+
+class InvalidSearchCursor(Exception):
+    pass
+
+
+class SearchUnavailable(Exception):
+    """The database backend has no full-text search support here."""
+
+
+def ensure_search_index(using='default'):
+    """
+    Create the full-text index for products if it does not exist yet.
+
+    SQLite gets an external-content FTS5 table kept in sync by triggers on
+    product insert, update and delete; PostgreSQL gets a GIN expression index,
+    which the database maintains on every write by itself.
+    """
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'product_fts'")
+            created = cursor.fetchone() is None
+            for statement in SQLITE_SCHEMA:
+                cursor.execute(statement)
+            if created:
+                cursor.execute("INSERT INTO product_fts(product_fts) VALUES ('rebuild')")
+    elif connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            for statement in POSTGRES_SCHEMA:
+                cursor.execute(statement)
+
+
+def _sqlite_match(query):
+    terms = re.findall(r'\w+', query)
+    return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+def encode_cursor(score, product_id):
+    raw = json.dumps({'s': score, 'id': product_id}).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return float(data['s']), int(data['id'])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidSearchCursor("Invalid cursor.")
+
+
+def search_product_ids(query, page_size, cursor=None, using='default'):
+    """
+    Return up to `page_size` (product_id, score) pairs for active products
+    matching `query`, best match first, starting after `cursor`.
+    """
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        match = _sqlite_match(query)
+        sql = SQLITE_QUERY
+    elif connection.vendor == 'postgresql':
+        match = query
+        sql = POSTGRES_QUERY
+    else:
+        raise SearchUnavailable(f"Full-text search is not available on {connection.vendor}.")
+
+    if not match:
+        return []
+
+    params = [match]
+    after = ''
+    if cursor:
+        score, last_id = decode_cursor(cursor)
+        after = AFTER_CURSOR
+        params += [score, score, last_id]
+    params.append(page_size)
+
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(sql.format(after=after), params)
+        return db_cursor.fetchall()
+
+
+def search_products(request, query, page_size, listing):
+    """
+    Run one page of a product search and build the response `data` payload,
+    with results in relevance order and an opaque cursor for the next page.
+    `listing` joins and serializes the matched products.
+    """
+    rows = search_product_ids(query, page_size + 1, request.GET.get('cursor'))
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    products = listing.prepare(listing.model.objects.all()).in_bulk([product_id for product_id, _ in rows])
+    results = []
+    for product_id, score in rows:
+        if product_id in products:
+            item = listing.row(products[product_id])
+            item['score'] = score
+            results.append(item)
+
+    next_link = None
+    if has_more:
+        last_id, last_score = rows[-1]
+        next_link = replace_query_param(
+            request.build_absolute_uri(), 'cursor', encode_cursor(last_score, last_id)
+        )
+
+    return {
+        "results": results,
+        "page_size": page_size,
+        "next": next_link
+    }
@@ -5,32 +5,7 @@ from django.contrib.auth.hashers import make_password
 from datetime import timedelta
 from django.utils.dateparse import parse_datetime
 from .models import ProductPrice
-
-def get_calculated_price(self, obj):
-    start = obj.timestamp_from
-    end = obj.timestamp_to
-    if not start or not end or start >= end:
-        total_days = 1
-    else:
-        total_days = (end - start).days or 1
-
-    prices = obj.product.prices.all()
-    
-    day_price = prices.filter(time_duration__iexact='day').first()
-    if day_price:
-        return day_price.price * total_days * obj.quantity
-    
-    hour_price = prices.filter(time_duration__iexact='hour').first()
-    if hour_price:
-        hours = total_days * 24
-        return hour_price.price * hours * obj.quantity
-    
-    week_price = prices.filter(time_duration__iexact='week').first()
-    if week_price:
-        weeks = total_days / 7
-        return week_price.price * weeks * obj.quantity
-    
-    return 0
+from .pricing import price_items
 
 
 class UserRoleSerializer(serializers.ModelSerializer):
@@ -185,10 +160,11 @@ class OrderSerializer(serializers.ModelSerializer):
             'order_id', 'product', 'product_id', 'user_data', 'user_data_id',
             'payment', 'payment_id', 'status', 'status_id',
             'timestamp_from', 'timestamp_to', 'created_at',
-            'quantity' 
+            'quantity', 'total_price'
         ]
         extra_kwargs = {
             'created_at': {'read_only': True},
+            'total_price': {'read_only': True},
         }
 
 
@@ -284,6 +260,17 @@ class WishlistSerializer(serializers.ModelSerializer):
         read_only_fields = ['wishlist_id', 'added_at']
 
 
+class CartListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        # Price the whole cart with one tariff query instead of per row.
+        items = list(data.select_related('product') if hasattr(data, 'select_related') else data)
+        self.context['calculated_prices'] = dict(zip(
+            (item.cart_id for item in items),
+            price_items((item.product_id, item.timestamp_from, item.timestamp_to, item.quantity) for item in items)
+        ))
+        return super().to_representation(items)
+
+
 class CartSerializer(serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.product_name', read_only=True)
     calculated_price = serializers.SerializerMethodField()
@@ -295,44 +282,10 @@ class CartSerializer(serializers.ModelSerializer):
             'quantity', 'timestamp_from', 'timestamp_to',
             'calculated_price', 'added_at'
         ]
+        list_serializer_class = CartListSerializer
 
     def get_calculated_price(self, obj):
-        start = obj.timestamp_from
-        end = obj.timestamp_to
-        quantity = obj.quantity or 1
-
-        # Validate dates
-        if not start or not end or start >= end:
-            return 0
-
-        delta = end - start
-        total_hours = delta.total_seconds() / 3600
-
-        prices = obj.product.prices.filter(active=True)
-        if not prices.exists():
-            return 0
-
-        # Try to find the best matching price duration (in priority order)
-        for duration in ['hour', 'day', 'week', 'month', 'year']:
-            price_obj = prices.filter(time_duration__iexact=duration).first()
-            if price_obj:
-                price_per_unit = price_obj.price
-
-                if duration == 'hour':
-                    units = total_hours
-                elif duration == 'day':
-                    units = total_hours / 24
-                elif duration == 'week':
-                    units = total_hours / (24 * 7)
-                elif duration == 'month':
-                    units = total_hours / (24 * 30) 
-                elif duration == 'year':
-                    units = total_hours / (24 * 365) 
-                else:
-                    units = total_hours / 24  # default fallback
-
-                total_price = price_per_unit * units * quantity
-                return round(total_price, 2)
-
-        # Fallback if no price found
-        return 0
+        prices = self.context.get('calculated_prices', {})
+        if obj.cart_id in prices:
+            return prices[obj.cart_id]
+        return price_items([(obj.product_id, obj.timestamp_from, obj.timestamp_to, obj.quantity)])[0]
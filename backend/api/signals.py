@@ -0,0 +1,149 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .cards import refresh_product_cards, rename_category_on_cards, rename_vendor_on_cards
+from .capacity import HOLD_FIELDS, move_hold, order_hold, released_status_ids
+from .catalog_cache import bump_availability_version, bump_catalog_version
+from .facets import sync_product_facets
+from .models import Category, Order, Product, ProductPrice, UserData, Wishlist
+from .pricing import invalidate_tariffs
+from .search import ensure_search_index
+from .token_cache import token_cache
+from .trending import record_activity
+
+
+@receiver(post_save, sender=UserData)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    # Cached tokens carry a copy of the user row, so any change to the user
+    # (profile edits, deactivation) has to drop them.
+    if not created:
+        token_cache.invalidate_user(instance.user_data_id)
+
+
+@receiver(post_migrate)
+def create_search_index(sender, using, **kwargs):
+    if sender.name == 'api':
+        ensure_search_index(using)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def update_product_facets(sender, instance, **kwargs):
+    sync_product_facets([instance.product_id])
+
+
+@receiver(post_save, sender=ProductPrice)
+@receiver(post_delete, sender=ProductPrice)
+def update_price_facets(sender, instance, **kwargs):
+    sync_product_facets([instance.product_id])
+
+
+@receiver(post_save, sender=ProductPrice)
+@receiver(post_delete, sender=ProductPrice)
+def invalidate_product_tariff(sender, instance, **kwargs):
+    invalidate_tariffs([instance.product_id])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductPrice)
+@receiver(post_delete, sender=ProductPrice)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog_cache(sender, **kwargs):
+    # Bump after commit so a concurrent reader cannot cache pre-commit data
+    # under the new version. Likes bump it when flush_like_counts() folds
+    # them into Product.likes, not on every click.
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=UserData)
+def invalidate_catalog_cache_for_vendor(sender, instance, created, **kwargs):
+    # Product responses embed the vendor's user data.
+    if not created:
+        transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=Product)
+def update_product_card(sender, instance, **kwargs):
+    refresh_product_cards([instance.product_id])
+
+
+@receiver(post_save, sender=ProductPrice)
+@receiver(post_delete, sender=ProductPrice)
+def update_product_card_prices(sender, instance, **kwargs):
+    # When the whole product is being deleted its card goes with it.
+    if isinstance(kwargs.get('origin'), Product):
+        return
+    refresh_product_cards([instance.product_id])
+
+
+@receiver(post_save, sender=Category)
+def update_card_category_name(sender, instance, created, **kwargs):
+    if not created:
+        rename_category_on_cards(instance.category_id, instance.category_name)
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_products(sender, instance, **kwargs):
+    instance._product_ids = list(
+        Product.objects.filter(category_id=instance.category_id).values_list('product_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Category)
+def refresh_recategorized_products(sender, instance, **kwargs):
+    # SET_DEFAULT moves the products in SQL, without Product signals.
+    product_ids = getattr(instance, '_product_ids', [])
+    if product_ids:
+        sync_product_facets(product_ids)
+        refresh_product_cards(product_ids)
+
+
+@receiver(post_save, sender=UserData)
+def update_card_vendor_name(sender, instance, created, **kwargs):
+    if not created:
+        rename_vendor_on_cards(instance.user_data_id, instance.user_name)
+
+
+@receiver(post_save, sender=Wishlist)
+def rank_wishlist_add(sender, instance, created, **kwargs):
+    if created:
+        record_activity('wishlist', {instance.product_id: 1})
+
+
+@receiver(pre_save, sender=Order)
+def remember_order_status(sender, instance, **kwargs):
+    previous = (
+        Order.objects.filter(pk=instance.pk).values_list(*HOLD_FIELDS).first()
+        if instance.pk else None
+    )
+    instance._previous_status_id = previous[0] if previous else None
+    instance._previous_hold = previous
+
+
+@receiver(post_save, sender=Order)
+def rank_completed_order(sender, instance, **kwargs):
+    if instance.status_id == getattr(instance, '_previous_status_id', None):
+        return
+    if instance.status.status_name == 'completed':
+        record_activity('order', {instance.product_id: 1})
+
+
+@receiver(post_save, sender=Order)
+def update_day_reservations(sender, instance, **kwargs):
+    released = released_status_ids()
+    before = order_hold(getattr(instance, '_previous_hold', None), released)
+    after = order_hold(tuple(getattr(instance, field) for field in HOLD_FIELDS), released)
+    if before != after:
+        move_hold(before, after)
+        transaction.on_commit(bump_availability_version)
+
+
+@receiver(post_delete, sender=Order)
+def release_day_reservations(sender, instance, **kwargs):
+    hold = order_hold(tuple(getattr(instance, field) for field in HOLD_FIELDS), released_status_ids())
+    if hold:
+        move_hold(hold, None)
+        transaction.on_commit(bump_availability_version)
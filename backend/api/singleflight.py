@@ -0,0 +1,92 @@
+import threading
+import time
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent rebuilds of the same cache key.
+
+    Entries are stored as {'value', 'fresh_until'} and kept for `stale_ttl`
+    seconds past their freshness, so a stale copy can be served while one
+    caller rebuilds. Within a process, the first caller for a key builds and
+    the others wait on it; across workers, the builder holds a short lock
+    taken with cache.add() in the shared backend. A caller that loses the
+    lock serves the stale copy if there is one and otherwise waits for the
+    winner's result, falling back to building itself after `wait_timeout`.
+    """
+
+    def __init__(self, lock_timeout=10, wait_timeout=5, poll_interval=0.05):
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def get_or_build(self, cache, key, build, ttl, stale_ttl=60):
+        """
+        Return the cached value for `key`, rebuilding it at most once at a time.
+
+        `build()` returns (value, cacheable); only cacheable values are stored.
+        """
+        entry = cache.get(key)
+        if entry is not None and entry['fresh_until'] > time.time():
+            return entry['value']
+        stale = entry['value'] if entry is not None else None
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            if stale is not None:
+                return stale
+            if flight.done.wait(self.wait_timeout) and flight.error is None:
+                return flight.value
+            return build()[0]
+
+        try:
+            flight.value = self._build_across_workers(cache, key, build, ttl, stale_ttl, stale)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            flight.done.set()
+            with self._lock:
+                self._flights.pop(key, None)
+
+    def _build_across_workers(self, cache, key, build, ttl, stale_ttl, stale):
+        lock_key = f"{key}:lock"
+        if not cache.add(lock_key, 1, timeout=self.lock_timeout):
+            if stale is not None:
+                return stale
+            deadline = time.monotonic() + self.wait_timeout
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                entry = cache.get(key)
+                if entry is not None and entry['fresh_until'] > time.time():
+                    return entry['value']
+            return self._store(cache, key, build, ttl, stale_ttl)
+
+        try:
+            return self._store(cache, key, build, ttl, stale_ttl)
+        finally:
+            cache.delete(lock_key)
+
+    def _store(self, cache, key, build, ttl, stale_ttl):
+        value, cacheable = build()
+        if cacheable:
+            cache.set(key, {'value': value, 'fresh_until': time.time() + ttl}, timeout=ttl + stale_ttl)
+        return value
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,31 @@
+import json
+from datetime import datetime, timezone as dt_timezone
+
+from api.models import UserData, UserRole
+
+
+BASE = datetime(2030, 1, 1, tzinfo=dt_timezone.utc)
+PASSWORD = 'secret'
+
+
+def make_user(email, role_name):
+    role, _ = UserRole.objects.get_or_create(user_role_name=role_name)
+    return UserData.objects.create(
+        user_name=email.split('@')[0], user_email=email, user_password=PASSWORD,
+        user_role=role, user_address='Street 1'
+    )
+
+
+def login(client, email):
+    """Log in through the API and return the access token."""
+    response = client.post(
+        '/api/login/',
+        json.dumps({'user_email': email, 'user_password': PASSWORD}),
+        content_type='application/json'
+    )
+    assert response.status_code == 200, response.content
+    return response.json()['data']['access_token']
+
+
+def auth(token):
+    return {'HTTP_AUTHORIZATION': f'Bearer {token}'}
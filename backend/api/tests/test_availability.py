@@ -0,0 +1,46 @@
+import random
+from datetime import timedelta
+
+from django.test import SimpleTestCase
+
+from api.availability import AvailabilityCalendar
+
+from .helpers import BASE
+
+
+class AvailabilityCalendarTests(SimpleTestCase):
+    @staticmethod
+    def brute_force(reservations, start, end):
+        if start >= end:
+            return 0
+        instants = {start} | {point for res in reservations for point in res[:2] if start <= point < end}
+        return max(
+            sum(quantity for res_start, res_end, quantity in reservations if res_start <= instant < res_end)
+            for instant in instants
+        )
+
+    def test_max_reserved_matches_brute_force(self):
+        rng = random.Random(24)
+        for _ in range(300):
+            reservations = []
+            for _ in range(rng.randint(0, 12)):
+                start = rng.randint(0, 50)
+                reservations.append((
+                    BASE + timedelta(hours=start),
+                    BASE + timedelta(hours=start + rng.randint(-3, 20)),
+                    rng.randint(1, 4),
+                ))
+            calendar = AvailabilityCalendar(reservations)
+            valid = [res for res in reservations if res[0] < res[1]]
+
+            for _ in range(20):
+                start = BASE + timedelta(hours=rng.randint(-5, 75))
+                end = start + timedelta(hours=rng.randint(0, 30))
+                self.assertEqual(calendar.max_reserved(start, end), self.brute_force(valid, start, end))
+
+    def test_back_to_back_rentals_do_not_overlap(self):
+        calendar = AvailabilityCalendar([
+            (BASE, BASE + timedelta(days=1), 2),
+            (BASE + timedelta(days=1), BASE + timedelta(days=2), 2),
+        ])
+        self.assertEqual(calendar.max_reserved(BASE, BASE + timedelta(days=2)), 2)
@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from api.models import Category, InvoiceType, Order, Payment, Product, Status
+
+from .helpers import BASE, auth, login, make_user
+
+
+@override_settings(PASSWORD_HASHING={'ENABLED': False})
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(category_name='Tools')
+        self.vendor = make_user('vendor@example.com', 'vendor')
+        self.customer = make_user('customer@example.com', 'customer')
+        self.product = Product.objects.create(
+            product_name='Drill', product_qty=3, category=self.category, created_by=self.vendor
+        )
+        self.pending = Status.objects.create(status_name='pending')
+        self.confirmed = Status.objects.create(status_name='confirmed')
+        self.payment = Payment.objects.create(
+            invoice_type=InvoiceType.objects.create(invoice_type='deposit'),
+            status=self.pending, payment_percentage=20
+        )
+        self.order = Order.objects.create(
+            product=self.product, user_data=self.customer, payment=self.payment, status=self.pending,
+            timestamp_from=BASE, timestamp_to=BASE + timedelta(days=1)
+        )
+
+    def revalidate(self, url, etag, **headers):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag, **headers)
+
+    def assertChanged(self, url, etag, **headers):
+        response = self.revalidate(url, etag, **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        return response
+
+    def test_product_not_modified_until_it_changes(self):
+        url = f'/api/products/{self.product.pk}/'
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.revalidate(url, first['ETag']).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.product_name = 'Hammer drill'
+            self.product.save()
+        response = self.assertChanged(url, first['ETag'])
+        self.assertEqual(response.json()['data']['product_name'], 'Hammer drill')
+
+    def test_product_etag_follows_category_and_vendor(self):
+        url = f'/api/products/{self.product.pk}/'
+        etag = self.client.get(url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.category_name = 'Power tools'
+            self.category.save()
+        etag = self.assertChanged(url, etag)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vendor.user_name = 'Renamed vendor'
+            self.vendor.save()
+        self.assertChanged(url, etag)
+
+    def test_missing_product_has_no_etag(self):
+        response = self.client.get('/api/products/999/', HTTP_IF_NONE_MATCH='"anything"')
+        self.assertEqual(response.status_code, 404)
+
+    def test_order_list_not_modified_until_an_embedded_row_changes(self):
+        headers = auth(login(self.client, self.customer.user_email))
+        first = self.client.get('/api/orders/', **headers)
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+        self.assertEqual(self.revalidate('/api/orders/', etag, **headers).status_code, 304)
+
+        self.order.status = self.confirmed
+        self.order.save()
+        etag = self.assertChanged('/api/orders/', etag, **headers)['ETag']
+
+        self.payment.status = self.confirmed
+        self.payment.save()
+        etag = self.assertChanged('/api/orders/', etag, **headers)['ETag']
+
+        self.vendor.user_name = 'Renamed vendor'
+        self.vendor.save()
+        etag = self.assertChanged('/api/orders/', etag, **headers)['ETag']
+
+        response = self.client.post(
+            '/api/user/update-profile/', {'user_address': 'Street 2'}, content_type='application/json', **headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertChanged('/api/orders/', etag, **headers)
+
+    def test_order_etags_are_per_user(self):
+        other = make_user('other@example.com', 'customer')
+        etag = self.client.get('/api/orders/', **auth(login(self.client, self.customer.user_email)))['ETag']
+        response = self.revalidate('/api/orders/', etag, **auth(login(self.client, other.user_email)))
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,143 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from api.facets import apply_catalog_filters, catalog_facets, facet_counts
+from api.models import CatalogFacet, Category, Product, ProductPrice
+
+from .helpers import make_user
+
+
+def snapshot():
+    return set(
+        CatalogFacet.objects.filter(product_count__gt=0).values_list('scope', 'facet', 'value', 'product_count')
+    )
+
+
+@override_settings(PASSWORD_HASHING={'ENABLED': False}, CATALOG_PRICE_BUCKETS=[0, 50, 100])
+class FacetMaintenanceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Products fall back to category 1 when theirs is deleted.
+        self.default = Category.objects.create(category_id=1, category_name='Uncategorized')
+        self.tools = Category.objects.create(category_name='Tools')
+        self.garden = Category.objects.create(category_name='Garden')
+        self.vendor = make_user('vendor@example.com', 'vendor')
+        self.other = make_user('other@example.com', 'vendor')
+
+    def product(self, name, category, vendor, qty=1):
+        return Product.objects.create(product_name=name, product_qty=qty, category=category, created_by=vendor)
+
+    def counts(self, scope=''):
+        return {
+            facet: {row['value']: row['count'] for row in rows}
+            for facet, rows in facet_counts(scope).items()
+        }
+
+    def assertMatchesRebuild(self):
+        incremental = snapshot()
+        call_command('rebuild_catalog_facets', stdout=StringIO())
+        self.assertEqual(incremental, snapshot())
+
+    def test_counts_follow_product_and_price_writes(self):
+        drill = self.product('Drill', self.tools, self.vendor)
+        mower = self.product('Mower', self.garden, self.vendor, qty=0)
+        saw = self.product('Saw', self.tools, self.other)
+        day = ProductPrice.objects.create(product=drill, price=30, time_duration='day')
+        ProductPrice.objects.create(product=mower, price=80, time_duration='Day')
+
+        self.assertEqual(self.counts(), {
+            'category': {str(self.tools.pk): 2, str(self.garden.pk): 1},
+            'vendor': {str(self.vendor.pk): 2, str(self.other.pk): 1},
+            'in_stock': {'true': 2, 'false': 1},
+            'price_day': {'0-50': 1, '50-100': 1},
+        })
+        self.assertEqual(self.counts(f'category:{self.tools.pk}'), {
+            'category': {str(self.tools.pk): 2},
+            'vendor': {str(self.vendor.pk): 1, str(self.other.pk): 1},
+            'in_stock': {'true': 2},
+            'price_day': {'0-50': 1},
+        })
+        self.assertEqual(self.counts(f'vendor:{self.vendor.pk}')['in_stock'], {'true': 1, 'false': 1})
+
+        day.price = 120
+        day.save()
+        mower.category = self.tools
+        mower.save()
+        saw.active = False
+        saw.save()
+        self.assertEqual(self.counts(f'category:{self.tools.pk}'), {
+            'category': {str(self.tools.pk): 2},
+            'vendor': {str(self.vendor.pk): 2},
+            'in_stock': {'true': 1, 'false': 1},
+            'price_day': {'50-100': 1, '100+': 1},
+        })
+        self.assertEqual(self.counts(f'category:{self.garden.pk}'), {})
+        self.assertMatchesRebuild()
+
+        day.delete()
+        drill.delete()
+        self.assertEqual(self.counts(), {
+            'category': {str(self.tools.pk): 1},
+            'vendor': {str(self.vendor.pk): 1},
+            'in_stock': {'false': 1},
+            'price_day': {'50-100': 1},
+        })
+        self.assertMatchesRebuild()
+
+    def test_only_the_lowest_active_price_is_bucketed(self):
+        drill = self.product('Drill', self.tools, self.vendor)
+        ProductPrice.objects.create(product=drill, price=90, time_duration='day')
+        ProductPrice.objects.create(product=drill, price=20, time_duration='DAY', active=False)
+        ProductPrice.objects.create(product=drill, price=60, time_duration='Day')
+        self.assertEqual(self.counts()['price_day'], {'50-100': 1})
+        self.assertMatchesRebuild()
+
+    def test_category_delete_moves_counts_to_the_default_category(self):
+        self.product('Drill', self.tools, self.vendor)
+        self.product('Saw', self.tools, self.other)
+        self.tools.delete()
+
+        self.assertEqual(self.counts()['category'], {str(self.default.pk): 2})
+        self.assertEqual(self.counts(f'category:{self.tools.pk}'), {})
+        self.assertEqual(self.counts(f'category:{self.default.pk}')['vendor'], {
+            str(self.vendor.pk): 1, str(self.other.pk): 1,
+        })
+        self.assertMatchesRebuild()
+
+    def test_listing_reads_the_narrowest_slice(self):
+        self.product('Drill', self.tools, self.vendor)
+        self.product('Mower', self.garden, self.other)
+
+        self.assertEqual(catalog_facets({'category': str(self.garden.pk)})['vendor'], [
+            {'value': str(self.other.pk), 'count': 1},
+        ])
+        self.assertEqual(catalog_facets({'vendor': str(self.vendor.pk)})['category'], [
+            {'value': str(self.tools.pk), 'count': 1},
+        ])
+        response = self.client.get('/api/products/', {'category': self.tools.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['facets']['category'], [
+            {'value': str(self.tools.pk), 'count': 1},
+        ])
+
+    def test_price_filter_uses_the_lowest_active_price(self):
+        drill = self.product('Drill', self.tools, self.vendor)
+        saw = self.product('Saw', self.tools, self.vendor)
+        ProductPrice.objects.create(product=drill, price=90, time_duration='day')
+        ProductPrice.objects.create(product=drill, price=40, time_duration='Day')
+        ProductPrice.objects.create(product=saw, price=70, time_duration='day')
+        ProductPrice.objects.create(product=saw, price=10, time_duration='day', active=False)
+
+        def matching(**params):
+            return list(
+                apply_catalog_filters(Product.objects.order_by('product_id'), params)
+                .values_list('product_name', flat=True)
+            )
+
+        self.assertEqual(matching(duration='day', max_price='50'), ['Drill'])
+        self.assertEqual(matching(duration='DAY', min_price='50'), ['Saw'])
+        with self.assertRaises(ValueError):
+            matching(min_price='50')
@@ -0,0 +1,93 @@
+import io
+import json
+
+from django.test import TestCase, override_settings
+
+from api.importer import import_products, iter_csv_rows, iter_ndjson_rows
+from api.models import Category, Product, ProductPrice
+
+from .helpers import auth, login, make_user
+
+
+def ndjson(*rows):
+    return io.BytesIO('\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows).encode())
+
+
+@override_settings(PASSWORD_HASHING={'ENABLED': False}, PRODUCT_IMPORT={'CHUNK_SIZE': 2})
+class ImportProductsTests(TestCase):
+    def setUp(self):
+        Category.objects.get_or_create(category_id=1, defaults={'category_name': 'General'})
+        self.vendor = make_user('vendor@example.com', 'vendor')
+
+    def test_imports_valid_rows_across_chunks(self):
+        report = import_products(iter_ndjson_rows(ndjson(
+            {'product_name': 'Tent', 'product_qty': 2, 'category_name': 'Camping', 'prices': {'Day': 40}},
+            {'product_name': 'Stove', 'product_qty': '1', 'price_week': '90'},
+            {'product_name': 'Lamp', 'product_qty': 3.0},
+        )), self.vendor)
+
+        self.assertEqual((report['rows'], report['created'], report['failed']), (3, 3, 0))
+        tent = Product.objects.get(product_name='Tent')
+        self.assertEqual(tent.category.category_name, 'Camping')
+        self.assertEqual(list(tent.prices.values_list('time_duration', 'price')), [('day', 40)])
+        self.assertEqual(Product.objects.get(product_name='Stove').category_id, 1)
+        self.assertEqual(ProductPrice.objects.filter(product__product_name='Stove').get().price, 90)
+
+    def test_reports_row_errors_and_keeps_valid_rows(self):
+        report = import_products(iter_ndjson_rows(ndjson(
+            '{not json',
+            {'product_name': 'Tent', 'product_qty': 1, 'prices': [1, 2]},
+            {'product_name': 'Tent', 'product_qty': 1, 'prices': 'abc'},
+            {'product_name': 'Fractional', 'product_qty': 1.5},
+            {'product_name': 'Bool', 'product_qty': True},
+            {'product_name': 'Price', 'product_qty': 1, 'prices': {'day': 3.7, 'fortnight': 5}},
+            {'product_name': '', 'product_qty': -1},
+            {'product_name': 'Good', 'product_qty': 1},
+        )), self.vendor)
+
+        self.assertEqual((report['rows'], report['created'], report['failed']), (8, 1, 7))
+        errors = {error['row']: error['errors'] for error in report['errors']}
+        self.assertEqual(errors[1], {'row': 'Malformed row.'})
+        self.assertEqual(errors[2], {'row': 'Malformed row.'})
+        self.assertEqual(errors[3], {'row': 'Malformed row.'})
+        self.assertIn('product_qty', errors[4])
+        self.assertIn('product_qty', errors[5])
+        self.assertEqual(set(errors[6]), {'price_day', 'price_fortnight'})
+        self.assertEqual(set(errors[7]), {'product_name', 'product_qty'})
+        self.assertEqual(list(Product.objects.values_list('product_name', flat=True)), ['Good'])
+
+    @override_settings(PRODUCT_IMPORT={'MAX_ERRORS': 1})
+    def test_truncates_error_list(self):
+        report = import_products(iter_ndjson_rows(ndjson('x', 'y', 'z')), self.vendor)
+        self.assertEqual((report['failed'], len(report['errors']), report['errors_truncated']), (3, 1, True))
+
+    def test_reads_csv_price_columns(self):
+        rows = list(iter_csv_rows(io.BytesIO(b'product_name,product_qty,price_day,price_hour\nTent,2,40,\n')))
+        self.assertEqual(rows[0][1]['prices'], {'day': '40'})
+
+
+@override_settings(PASSWORD_HASHING={'ENABLED': False})
+class ProductImportViewTests(TestCase):
+    def setUp(self):
+        Category.objects.get_or_create(category_id=1, defaults={'category_name': 'General'})
+        make_user('vendor@example.com', 'vendor')
+        self.headers = auth(login(self.client, 'vendor@example.com'))
+
+    def post(self, body, content_type='application/x-ndjson'):
+        return self.client.post('/api/products/import/', body, content_type=content_type, **self.headers)
+
+    def test_partial_import_is_created_with_error_count(self):
+        response = self.post('{"product_name": "Tent", "product_qty": 1}\n{"product_name": "Bad", "product_qty": 1, "prices": [1]}')
+        body = response.json()
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(body['isSuccess'])
+        self.assertEqual((body['data']['created'], body['data']['failed']), (1, 1))
+        self.assertEqual(body['error'], "1 rows failed validation.")
+
+    def test_empty_upload_is_rejected(self):
+        response = self.post('product_name,product_qty\n', content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()['isSuccess'])
+
+    def test_unsupported_content_type(self):
+        self.assertEqual(self.post('{}', content_type='application/xml').status_code, 415)
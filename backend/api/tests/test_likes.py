@@ -0,0 +1,89 @@
+from django.test import TestCase, override_settings
+
+from api.likes import flush_like_counts, like_count, reconcile_like_counts, toggle_like
+from api.models import Category, Product, ProductCard, ProductLikeShard
+
+from .helpers import make_user
+
+
+@override_settings(PASSWORD_HASHING={'ENABLED': False})
+class LikeCounterTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(category_name='Tools')
+        vendor = make_user('vendor@example.com', 'vendor')
+        self.customers = [make_user(f'customer{i}@example.com', 'customer') for i in range(3)]
+        self.product = Product.objects.create(product_name='Drill', product_qty=1, category=category, created_by=vendor)
+
+    def likes(self):
+        return Product.objects.values_list('likes', flat=True).get(pk=self.product.pk)
+
+    def test_toggle_counts_in_shards_until_flushed(self):
+        for customer in self.customers:
+            self.assertEqual(toggle_like(customer, self.product.pk), 'liked')
+        self.assertEqual(toggle_like(self.customers[0], self.product.pk), 'unliked')
+
+        self.assertEqual(self.likes(), 0)
+        self.assertEqual(like_count(self.product.pk), 2)
+
+        self.assertEqual(flush_like_counts(), 1)
+        self.assertEqual(self.likes(), 2)
+        self.assertEqual(like_count(self.product.pk), 2)
+        self.assertFalse(ProductLikeShard.objects.exists())
+        self.assertEqual(ProductCard.objects.get(product_id=self.product.pk).likes, 2)
+
+    def test_flush_without_pending_deltas(self):
+        self.assertEqual(flush_like_counts(), 0)
+
+    def test_flush_clamps_drifted_counter_at_zero(self):
+        ProductLikeShard.objects.create(product=self.product, shard=0, delta=-3)
+        self.assertEqual(flush_like_counts(), 1)
+        self.assertEqual(self.likes(), 0)
+        self.assertFalse(ProductLikeShard.objects.exists())
+
+    @override_settings(LIKE_COUNTER_SHARDS=1)
+    def test_flushes_in_batches(self):
+        products = [self.product] + [
+            Product.objects.create(product_name=f'P{i}', product_qty=1, category=self.product.category,
+                                   created_by=self.product.created_by)
+            for i in range(4)
+        ]
+        for product in products:
+            toggle_like(self.customers[0], product.pk)
+        self.assertEqual(flush_like_counts(batch_size=2), 5)
+        self.assertEqual(set(Product.objects.values_list('likes', flat=True)), {1})
+
+
+@override_settings(PASSWORD_HASHING={'ENABLED': False})
+class ReconcileLikeCountsTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(category_name='Tools')
+        vendor = make_user('vendor@example.com', 'vendor')
+        self.customers = [make_user(f'customer{i}@example.com', 'customer') for i in range(2)]
+        self.products = [
+            Product.objects.create(product_name=f'P{i}', product_qty=1, category=category, created_by=vendor)
+            for i in range(3)
+        ]
+        for customer in self.customers:
+            toggle_like(customer, self.products[0].pk)
+        toggle_like(self.customers[0], self.products[1].pk)
+        flush_like_counts()
+
+    def test_corrects_drifted_counts(self):
+        Product.objects.filter(pk=self.products[0].pk).update(likes=7)
+        Product.objects.filter(pk=self.products[2].pk).update(likes=4)
+
+        self.assertEqual(reconcile_like_counts(batch_size=2), (3, 2))
+        self.assertEqual(list(Product.objects.order_by('pk').values_list('likes', flat=True)), [2, 1, 0])
+        self.assertEqual(ProductCard.objects.get(product_id=self.products[2].pk).likes, 0)
+        self.assertEqual(reconcile_like_counts(), (3, 0))
+
+    def test_pending_deltas_are_not_drift(self):
+        toggle_like(self.customers[1], self.products[1].pk)
+        self.assertEqual(reconcile_like_counts(), (3, 0))
+        flush_like_counts()
+        self.assertEqual(Product.objects.values_list('likes', flat=True).get(pk=self.products[1].pk), 2)
+
+    def test_dry_run_writes_nothing(self):
+        Product.objects.filter(pk=self.products[0].pk).update(likes=7)
+        self.assertEqual(reconcile_like_counts(dry_run=True), (3, 1))
+        self.assertEqual(Product.objects.values_list('likes', flat=True).get(pk=self.products[0].pk), 7)
@@ -0,0 +1,59 @@
+import random
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from api.models import Category, Product, ProductPrice
+from api.pricing import price_items
+
+from .helpers import BASE, make_user
+
+
+@override_settings(PASSWORD_HASHING={'ENABLED': False})
+class PriceItemsTests(TestCase):
+    """price_items must give the same amounts as the old per-row cart calculator."""
+
+    @staticmethod
+    def per_row_price(product, start, end, quantity):
+        # The calculator CartSerializer used before batch pricing, one query per row.
+        if not start or not end or start >= end:
+            return 0
+        total_hours = (end - start).total_seconds() / 3600
+        prices = product.prices.filter(active=True)
+        for duration, unit_hours in [('hour', 1), ('day', 24), ('week', 24 * 7), ('month', 24 * 30), ('year', 24 * 365)]:
+            price_obj = prices.filter(time_duration__iexact=duration).first()
+            if price_obj:
+                return round(price_obj.price * (total_hours / unit_hours) * (quantity or 1), 2)
+        return 0
+
+    def setUp(self):
+        # Tariff tables are cached by product id, and ids repeat across tests.
+        cache.clear()
+
+    def test_matches_per_row_formula(self):
+        rng = random.Random(21)
+        category = Category.objects.create(category_name='Tools')
+        vendor = make_user('vendor@example.com', 'vendor')
+
+        products = []
+        for i in range(30):
+            product = Product.objects.create(
+                product_name=f'Product {i}', product_qty=5, category=category, created_by=vendor
+            )
+            for duration in rng.sample(['hour', 'Day', 'week', 'month', 'year'], rng.randint(0, 3)):
+                ProductPrice.objects.create(product=product, price=rng.randint(1, 900), time_duration=duration)
+            if rng.random() < 0.3:
+                ProductPrice.objects.create(product=product, price=1, time_duration='hour', active=False)
+            products.append(product)
+
+        items = []
+        for _ in range(500):
+            product = rng.choice(products)
+            start = BASE + timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+            end = start + timedelta(minutes=rng.randint(-120, 60 * 24 * 60))
+            items.append((product, start, end, rng.randint(1, 4)))
+
+        expected = [self.per_row_price(*item) for item in items]
+        actual = price_items([(product.product_id, start, end, quantity) for product, start, end, quantity in items])
+        self.assertEqual(actual, expected)
@@ -0,0 +1,95 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from api.models import Category, Product, ProductPrice
+from api.pricing import tariff_tables
+from api.repricing import PriceUpsertError, upsert_prices
+
+from .helpers import auth, login, make_user
+
+
+@override_settings(PASSWORD_HASHING={'ENABLED': False})
+class UpsertPricesTests(TestCase):
+    def setUp(self):
+        # Tariff tables are cached by product id, and ids repeat across tests.
+        cache.clear()
+        category = Category.objects.create(category_name='Tools')
+        self.vendor = make_user('vendor@example.com', 'vendor')
+        self.other = make_user('other@example.com', 'vendor')
+        self.drill = Product.objects.create(product_name='Drill', product_qty=1, category=category, created_by=self.vendor)
+        self.saw = Product.objects.create(product_name='Saw', product_qty=1, category=category, created_by=self.vendor)
+        self.foreign = Product.objects.create(product_name='Ladder', product_qty=1, category=category, created_by=self.other)
+        ProductPrice.objects.create(product=self.drill, price=10, time_duration='Day')
+        ProductPrice.objects.create(product=self.drill, price=50, time_duration='week')
+
+    def prices(self, product):
+        return sorted(product.prices.values_list('time_duration', 'price', 'active'))
+
+    def test_updates_creates_and_skips_unchanged(self):
+        summary = upsert_prices([
+            {'product_id': self.drill.product_id, 'time_duration': 'day', 'price': 12},
+            {'product_id': self.drill.product_id, 'time_duration': 'WEEK', 'price': 50},
+            {'product_id': self.saw.product_id, 'time_duration': 'hour', 'price': 3, 'active': False},
+        ], self.vendor)
+
+        self.assertEqual(summary, {'products': 2, 'created': 1, 'updated': 1, 'unchanged': 1})
+        # The existing row is matched case-insensitively and updated in place.
+        self.assertEqual(self.prices(self.drill), [('Day', 12, True), ('week', 50, True)])
+        self.assertEqual(self.prices(self.saw), [('hour', 3, False)])
+
+    def test_later_items_win(self):
+        upsert_prices([
+            {'time_duration': 'day', 'price': 20},
+            {'time_duration': 'day', 'price': 25},
+        ], self.vendor, product_id=self.saw.product_id)
+        self.assertEqual(self.prices(self.saw), [('day', 25, True)])
+
+    def test_invalid_items_write_nothing(self):
+        with self.assertRaises(PriceUpsertError) as raised:
+            upsert_prices([
+                {'product_id': self.drill.product_id, 'time_duration': 'day', 'price': 99},
+                {'product_id': self.drill.product_id, 'time_duration': 'fortnight', 'price': -1},
+            ], self.vendor)
+        self.assertEqual(raised.exception.errors, [
+            {'index': 1, 'errors': {'time_duration': "Invalid or missing time duration.", 'price': "A non-negative integer is required."}},
+        ])
+        self.assertEqual(self.prices(self.drill), [('Day', 10, True), ('week', 50, True)])
+
+    def test_foreign_products_write_nothing(self):
+        with self.assertRaises(PriceUpsertError):
+            upsert_prices([
+                {'product_id': self.drill.product_id, 'time_duration': 'day', 'price': 99},
+                {'product_id': self.foreign.product_id, 'time_duration': 'day', 'price': 1},
+            ], self.vendor)
+        self.assertEqual(self.prices(self.drill), [('Day', 10, True), ('week', 50, True)])
+        self.assertFalse(self.foreign.prices.exists())
+
+    def test_invalidates_cached_tariffs(self):
+        self.assertEqual(tariff_tables([self.drill.product_id])[self.drill.product_id]['day'], 10)
+        upsert_prices([{'time_duration': 'day', 'price': 15}], self.vendor, product_id=self.drill.product_id)
+        self.assertEqual(tariff_tables([self.drill.product_id])[self.drill.product_id]['day'], 15)
+
+
+@override_settings(PASSWORD_HASHING={'ENABLED': False})
+class ProductPriceUpsertViewTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(category_name='Tools')
+        vendor = make_user('vendor@example.com', 'vendor')
+        self.product = Product.objects.create(product_name='Drill', product_qty=1, category=category, created_by=vendor)
+        self.headers = auth(login(self.client, 'vendor@example.com'))
+
+    def post(self, body):
+        return self.client.post(
+            f'/api/products/{self.product.product_id}/prices/bulk/', json.dumps(body),
+            content_type='application/json', **self.headers
+        )
+
+    def test_upserts_for_product(self):
+        response = self.post({'prices': [{'time_duration': 'day', 'price': 10}]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['created'], 1)
+
+    def test_rejects_non_object_body(self):
+        self.assertEqual(self.post([{'time_duration': 'day', 'price': 10}]).status_code, 400)
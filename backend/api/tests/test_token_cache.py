@@ -0,0 +1,61 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.models import UserAccessToken
+from api.token_cache import TokenCache, token_cache
+
+from .helpers import auth, login, make_user
+
+
+EMAIL = 'customer@example.com'
+
+
+@override_settings(PASSWORD_HASHING={'ENABLED': False})
+class TokenInvalidationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        make_user(EMAIL, 'customer')
+
+    def test_logout_rejects_cached_token(self):
+        headers = auth(login(self.client, EMAIL))
+
+        # The first request caches the verified token.
+        self.assertEqual(self.client.get('/api/user/profile/', **headers).status_code, 200)
+        self.assertEqual(self.client.post('/api/logout/', **headers).status_code, 200)
+        self.assertEqual(self.client.get('/api/user/profile/', **headers).status_code, 401)
+
+    def test_new_login_rejects_previous_token(self):
+        headers = auth(login(self.client, EMAIL))
+        self.assertEqual(self.client.get('/api/user/profile/', **headers).status_code, 200)
+
+        # Tokens only differ by their iat second; a same-second login would reissue the old one.
+        later = timezone.now() + timedelta(seconds=1)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            login(self.client, EMAIL)
+        self.assertEqual(self.client.get('/api/user/profile/', **headers).status_code, 401)
+
+    @override_settings(ACCESS_TOKEN_CACHE={'BACKEND': 'default', 'LOCAL_TTL': 0})
+    def test_invalidation_reaches_other_workers_through_backend(self):
+        token = login(self.client, EMAIL)
+        access_token = UserAccessToken.objects.select_related('user_data').get(active=True)
+        worker_a, worker_b = TokenCache(), TokenCache()
+
+        worker_a.set(token, access_token, {})
+        self.assertIsNotNone(worker_b.get(token))
+
+        worker_a.invalidate(token)
+        self.assertIsNone(worker_b.get(token))
+
+    @override_settings(ACCESS_TOKEN_CACHE={'LOCAL_TTL': 5})
+    def test_local_entries_expire_after_local_ttl(self):
+        token = login(self.client, EMAIL)
+        access_token = UserAccessToken.objects.select_related('user_data').get(active=True)
+        worker = TokenCache()
+        worker.set(token, access_token, {})
+        self.assertIsNotNone(worker.get(token))
+
+        with mock.patch('api.token_cache.time.time', return_value=timezone.now().timestamp() + 6):
+            self.assertIsNone(worker.get(token))
@@ -0,0 +1,150 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from api.models import UserAccessToken
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'TTL': 300,
+    'MAX_ENTRIES': 10000,
+    'BACKEND': None,
+    'LOCAL_TTL': 5,
+}
+
+
+def _config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'ACCESS_TOKEN_CACHE', {}))
+    return config
+
+
+def _cache_key(digest):
+    return 'access_token:' + digest
+
+
+class TokenCache:
+    """
+    Cache of verified access tokens, keyed by UserAccessToken.make_digest.
+
+    Entries hold the UserAccessToken row (with user_data and user_role joined)
+    and the verified JWT claims, so a hit needs no queries. Entries live in a
+    bounded in-process LRU for at most LOCAL_TTL seconds and, when
+    ACCESS_TOKEN_CACHE['BACKEND'] names a CACHES alias, for up to TTL in that
+    shared cache. Invalidation clears this process and the shared cache at
+    once; other workers may still accept a revoked token from their own LRU
+    until its LOCAL_TTL runs out.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return _config()['ENABLED']
+
+    def _backend(self):
+        alias = _config()['BACKEND']
+        return caches[alias] if alias else None
+
+    def get(self, token):
+        if not self.enabled:
+            return None
+
+        key = _cache_key(UserAccessToken.make_digest(token))
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry['expires_at'] > now:
+                    self._entries.move_to_end(key)
+                    # Views may mutate request.user; hand out a private copy.
+                    return copy.deepcopy(entry['access_token']), entry['claims']
+                del self._entries[key]
+
+        backend = self._backend()
+        if backend is None:
+            return None
+
+        entry = backend.get(key)
+        if entry is None or entry['expires_at'] <= now:
+            return None
+
+        self._store_local(key, entry, now)
+        return copy.deepcopy(entry['access_token']), entry['claims']
+
+    def set(self, token, access_token, claims):
+        if not self.enabled:
+            return
+
+        config = _config()
+        now = time.time()
+        expires_at = now + config['TTL']
+
+        # Never outlive the token itself, whichever expiry comes first.
+        if claims.get('exp'):
+            expires_at = min(expires_at, claims['exp'])
+        if access_token.user_access_token_expiry:
+            expires_at = min(expires_at, access_token.user_access_token_expiry.timestamp())
+        if expires_at <= now:
+            return
+
+        key = _cache_key(UserAccessToken.make_digest(token))
+        entry = {'access_token': access_token, 'claims': claims, 'expires_at': expires_at}
+        self._store_local(key, entry, now)
+
+        backend = self._backend()
+        if backend is not None:
+            backend.set(key, entry, timeout=max(int(expires_at - now), 1))
+
+    def invalidate(self, *tokens):
+        self.invalidate_digests(*(UserAccessToken.make_digest(token) for token in tokens if token))
+
+    def invalidate_digests(self, *digests):
+        keys = [_cache_key(digest) for digest in digests]
+        if not keys:
+            return
+
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+        backend = self._backend()
+        if backend is not None:
+            backend.delete_many(keys)
+
+    def invalidate_user(self, user_data_id):
+        """
+        Drop every cached token belonging to a user. Must run before the
+        user's tokens are deactivated, since it looks up the active ones.
+        """
+        tokens = UserAccessToken.objects.filter(
+            user_data_id=user_data_id,
+            active=True
+        ).only('user_access_token', 'user_access_token_digest')
+        self.invalidate_digests(*(access_token.digest for access_token in tokens))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _store_local(self, key, entry, now):
+        config = _config()
+        max_entries = config['MAX_ENTRIES']
+        # Local copies are short-lived: other processes cannot reach them to invalidate.
+        entry = dict(entry, expires_at=min(entry['expires_at'], now + config['LOCAL_TTL']))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+
+token_cache = TokenCache()
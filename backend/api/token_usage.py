@@ -0,0 +1,107 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MODE': 'sync',
+    'FLUSH_INTERVAL': 30,
+    'MAX_PENDING': 5000,
+}
+
+
+def _config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'ACCESS_TOKEN_LAST_USED', {}))
+    return config
+
+
+class LastUsedBuffer:
+    """
+    Write-behind buffer for UserAccessToken.last_used_at.
+
+    Requests only record (token id, timestamp) in memory; the newest timestamp
+    per token is written with a single bulk UPDATE once FLUSH_INTERVAL seconds
+    have passed or MAX_PENDING tokens are waiting, and again at worker exit.
+    A daemon timer started with the first pending token flushes an idle
+    worker too, so last_used_at lags by at most about FLUSH_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._timer = None
+
+    @property
+    def write_behind(self):
+        return _config()['MODE'] == 'write_behind'
+
+    def record(self, access_token_id, used_at):
+        config = _config()
+        with self._lock:
+            previous = self._pending.get(access_token_id)
+            if previous is None or previous < used_at:
+                self._pending[access_token_id] = used_at
+            due = (
+                len(self._pending) >= config['MAX_PENDING']
+                or time.monotonic() - self._last_flush >= config['FLUSH_INTERVAL']
+            )
+            if not due:
+                self._schedule(config['FLUSH_INTERVAL'])
+        if due:
+            self.flush()
+
+    def _schedule(self, interval):
+        # Caller holds self._lock.
+        if self._timer is None:
+            self._timer = threading.Timer(interval, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread opened its own connection; do not leak it.
+            connections.close_all()
+
+    def flush(self):
+        from api.models import UserAccessToken
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            timer, self._timer = self._timer, None
+        if timer is not None and timer is not threading.current_thread():
+            timer.cancel()
+
+        if not pending:
+            return 0
+
+        rows = [
+            UserAccessToken(user_access_token_id=token_id, last_used_at=used_at)
+            for token_id, used_at in pending.items()
+        ]
+        try:
+            UserAccessToken.objects.bulk_update(rows, ['last_used_at'])
+        except DatabaseError:
+            logger.exception("Failed to flush last_used_at for %d tokens", len(rows))
+            with self._lock:
+                for token_id, used_at in pending.items():
+                    current = self._pending.get(token_id)
+                    if current is None or current < used_at:
+                        self._pending[token_id] = used_at
+                self._schedule(_config()['FLUSH_INTERVAL'])
+            return 0
+        return len(rows)
+
+
+last_used_buffer = LastUsedBuffer()
+atexit.register(last_used_buffer.flush)
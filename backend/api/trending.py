@@ -0,0 +1,132 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .counters import add_to_counter
+from .models import Order, Product, ProductLike, ProductTrending, Wishlist
+
+
+DEFAULTS = {
+    'HALF_LIFE_HOURS': 72,
+    'WINDOW_DAYS': 30,
+    'WEIGHTS': {'like': 1.0, 'wishlist': 2.0, 'order': 5.0},
+}
+
+
+def _config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'TRENDING', {}))
+    return config
+
+
+def _decay(at, anchor, half_life_hours):
+    """
+    Weight multiplier of an event at `at` relative to `anchor`. Events after
+    the anchor weigh more than 1 instead of older ones weighing less, so
+    stored scores never need rescaling between refreshes and still rank
+    exactly like scores decayed to the current time.
+    """
+    return 2 ** ((at - anchor).total_seconds() / 3600 / half_life_hours)
+
+
+def current_anchor():
+    """
+    The anchor new rows start from: the one the last refresh gave every row,
+    read from the table so refreshes in other processes are seen at once.
+    """
+    return (
+        ProductTrending.objects.order_by('-anchored_at').values_list('anchored_at', flat=True).first()
+        or timezone.now()
+    )
+
+
+def record_activity(kind, counts, at=None):
+    """
+    Add `counts` ({product_id: number of events}) of activity `kind` ('like',
+    'wishlist' or 'order') to the ranking incrementally. Each increment is
+    scaled against the anchor stored on the row it lands in.
+    """
+    config = _config()
+    weight, half_life = config['WEIGHTS'][kind], config['HALF_LIFE_HOURS']
+    at = at or timezone.now()
+    counts = {product_id: events for product_id, events in counts.items() if events}
+    if not counts:
+        return
+
+    anchors = dict(
+        ProductTrending.objects.filter(product_id__in=counts).values_list('product_id', 'anchored_at')
+    )
+    new_anchor = None
+    for product_id, events in sorted(counts.items()):
+        anchor = anchors.get(product_id)
+        if anchor is not None:
+            increment = weight * events * _decay(at, anchor, half_life)
+            # A refresh may have re-anchored the row since it was read; then fall through.
+            if ProductTrending.objects.filter(product_id=product_id, anchored_at=anchor).update(
+                score=F('score') + increment
+            ):
+                continue
+
+        # A row created concurrently takes the same latest anchor, so the same increment fits it.
+        if new_anchor is None:
+            new_anchor = current_anchor()
+        add_to_counter(
+            ProductTrending, {'product_id': product_id}, 'score',
+            weight * events * _decay(at, new_anchor, half_life),
+            defaults={'anchored_at': new_anchor}
+        )
+
+
+def refresh_trending(batch_size=1000):
+    """
+    Recompute every score from the last WINDOW_DAYS of likes, wishlist adds
+    and completed orders, re-anchored at the current time. Events are
+    streamed, so memory grows with the number of ranked products rather than
+    the number of events. Returns the number of ranked products.
+    """
+    config = _config()
+    anchor = timezone.now()
+    since = anchor - timedelta(days=config['WINDOW_DAYS'])
+    half_life = config['HALF_LIFE_HOURS']
+
+    sources = [
+        ('like', ProductLike.objects.filter(created_at__gte=since).values_list('product_id', 'created_at')),
+        ('wishlist', Wishlist.objects.filter(added_at__gte=since).values_list('product_id', 'added_at')),
+        ('order', Order.objects.filter(
+            status__status_name='completed', created_at__gte=since
+        ).values_list('product_id', 'created_at')),
+    ]
+
+    scores = defaultdict(float)
+    for kind, events in sources:
+        weight = config['WEIGHTS'][kind]
+        for product_id, at in events.order_by().iterator(chunk_size=batch_size):
+            scores[product_id] += weight * _decay(at, anchor, half_life)
+
+    with transaction.atomic():
+        ProductTrending.objects.all().delete()
+        ProductTrending.objects.bulk_create(
+            [
+                ProductTrending(product_id=product_id, score=score, anchored_at=anchor)
+                for product_id, score in scores.items()
+            ],
+            batch_size=batch_size
+        )
+
+    return len(scores)
+
+
+def order_by_trending(queryset):
+    """
+    Order a Product or ProductCard queryset by trending score, highest
+    first. Unranked products follow with a score of 0.
+    """
+    score = 'trending__score' if queryset.model is Product else 'product__trending__score'
+    return queryset.annotate(
+        trending_score=Coalesce(F(score), Value(0.0), output_field=FloatField())
+    ).order_by('-trending_score', 'product_id')
@@ -5,13 +5,18 @@ urlpatterns = [
     # Product URLs
     path('products/', product_list, name='product-list'),
     path('products/create/', product_create, name='product-create'),
+    path('products/import/', product_import, name='product-import'),
+    path('products/quote/', product_quote, name='product-quote'),
+    path('products/search/', product_search, name='product-search'),
     path('products/<int:id>/', product_retrieve, name='product-retrieve'),
+    path('products/<int:id>/recommendations/', product_recommendations, name='product-recommendations'),
     path('products/<int:id>/update/', product_update, name='product-update'),
     path('products/<int:id>/delete/', product_delete, name='product-delete'),
 
     # ProductPrice URLs (nested)
     path('products/<int:id>/prices/', product_price_list, name='product-price-list'),
     path('products/<int:id>/prices/create/', product_price_create, name='product-price-create'),
+    path('products/<int:id>/prices/bulk/', product_price_upsert, name='product-price-upsert'),
     path('products/<int:id>/prices/<int:price_id>/', product_price_retrieve, name='product-price-retrieve'),
     path('products/<int:id>/prices/<int:price_id>/update/', product_price_update, name='product-price-update'),
     path('products/<int:id>/prices/<int:price_id>/delete/', product_price_delete, name='product-price-delete'),
@@ -37,6 +42,7 @@ urlpatterns = [
 
     path('vendor/report/', vendor_report, name='vendor-report'),
     path('vendor/orders/', vendor_orders, name='vendor-orders'),
+    path('vendor/prices/bulk/', product_price_upsert, name='vendor-price-upsert'),
     
     # Generic URLs
     path('statuses/', status_list, name='status-list'),
@@ -1,5 +1,8 @@
 # Standard library imports
+import csv
 import json
+from collections import defaultdict
+from decimal import Decimal
 from datetime import timedelta
 from django.utils.dateparse import parse_datetime
 from django.utils.timezone import make_aware
@@ -7,14 +10,12 @@ from django.utils.timezone import make_aware
 # Third-party imports
 import jwt
 from django.conf import settings
-from django.contrib.auth.hashers import check_password, make_password
 from django.db import transaction
-from django.db.models import F
 from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import condition, require_http_methods
 from django.template.loader import render_to_string
 from datetime import datetime
 from django.utils.timezone import make_aware
@@ -29,7 +30,21 @@ from rest_framework.pagination import PageNumberPagination
 from .models import *
 from .serializers import *
 from .permissions import IsOwner
-from api.authentication import require_access_token
+from api.authentication import get_auth_context, require_access_token
+from api.token_cache import token_cache
+from api.hashing import HashingBusy, hashing_service
+from api.pagination import cursor_paginate, is_cursor_request
+from api.search import InvalidSearchCursor, SearchUnavailable, search_products
+from api.facets import apply_catalog_filters, catalog_facets
+from api.listings import order_listing, product_card_listing, product_listing, product_price_listing
+from api.catalog_cache import cache_catalog_response
+from api.importer import import_products, row_reader
+from api.likes import like_count, toggle_like
+from api.trending import order_by_trending
+from api.availability import available_quantity
+from api.pricing import QuoteError, load_tariffs, price_items, quote, to_money
+from api.repricing import PriceUpsertError, upsert_prices
+from api.conditional import cart_list_etag, order_list_etag, product_etag, user_profile_etag
 from utils.message import ERROR_MESSAGES
 from utils.email import send_mail
 from .permissions import vendor_required, customer_required
@@ -54,6 +69,8 @@ def register_user_view(request):
         return JsonResponse({"isSuccess": False, "data": None, "error": serializer.errors}, status=400)
     except json.JSONDecodeError:
         return JsonResponse({"isSuccess": False, "data": None, "error": "Invalid JSON"}, status=400)
+    except HashingBusy as e:
+        return JsonResponse({"isSuccess": False, "data": None, "error": str(e)}, status=503)
     except Exception as e:
         return JsonResponse({"isSuccess": False, "data": None, "error": str(e)}, status=500)
 
@@ -73,33 +90,36 @@ def login_user_view(request):
             }, status=400)
 
         try:
-            user = UserData.objects.get(user_email=user_email, active=True)
+            user = UserData.objects.select_related('user_role').get(user_email=user_email, active=True)
         except UserData.DoesNotExist:
             return JsonResponse({
                 "isSuccess": False,
                 "error": ERROR_MESSAGES.get('INVALID_CREDENTIALS', 'Invalid email or password')
             }, status=401)
 
-        if not check_password(password, user.user_password):
+        if not hashing_service.check_password(password, user.user_password):
             return JsonResponse({
                 "isSuccess": False,
                 "error": ERROR_MESSAGES.get('INVALID_CREDENTIALS', 'Invalid email or password')
             }, status=401)
 
+        token_cache.invalidate_user(user.user_data_id)
         UserAccessToken.objects.filter(user_data=user, active=True).update(active=False)
 
         now = timezone.now()
         expiry = now + timedelta(days=7)
         payload = {
             'user_id': str(user.user_data_id),
+            'role_id': user.user_role.user_role_id,
+            'role': user.user_role.user_role_name.lower(),
             'iat': int(now.timestamp()),
             'exp': int(expiry.timestamp())
         }
         token = jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
 
-        UserAccessToken.objects.create(
+        UserAccessToken.objects.create_for_token(
+            token,
             user_data=user,
-            user_access_token=token,
             user_access_token_expiry=expiry,
             active=True
         )
@@ -117,6 +137,8 @@ def login_user_view(request):
             "error": None
         }, status=200)
 
+    except HashingBusy as e:
+        return JsonResponse({"isSuccess": False, "error": str(e)}, status=503)
     except Exception as e:
         return JsonResponse({
             "isSuccess": False,
@@ -186,7 +208,7 @@ def reset_password_view(request):
             }, status=drf_status.HTTP_400_BAD_REQUEST)
 
         user = reset_token_obj.user
-        user.user_password = make_password(new_password)
+        user.user_password = hashing_service.make_password(new_password)
         user.save()
 
         reset_token_obj.delete()
@@ -203,6 +225,9 @@ def reset_password_view(request):
             "error": "Invalid token."
         }, status=drf_status.HTTP_400_BAD_REQUEST)
 
+    except HashingBusy as e:
+        return JsonResponse({"isSuccess": False, "error": str(e)}, status=drf_status.HTTP_503_SERVICE_UNAVAILABLE)
+
     except Exception as e:
         return JsonResponse({"isSuccess": False, "error": str(e)}, status=drf_status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -212,19 +237,19 @@ def reset_password_view(request):
 @require_access_token
 def logout_user_view(request):
     try:
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        token = auth_header.split(' ')[1] if ' ' in auth_header else None
-        if not token:
+        context = get_auth_context(request)
+        if not context.token:
             return JsonResponse({"isSuccess": False, "error": "Missing token"}, status=400)
 
-        try:
-            token_record = UserAccessToken.objects.get(user_access_token=token, active=True)
-            token_record.active = False
-            token_record.save()
-            return JsonResponse({"isSuccess": True, "data": {"message": "Logged out"}}, status=200)
-        except UserAccessToken.DoesNotExist:
+        token_record = context.access_token
+        if token_record is None or not token_record.active:
             return JsonResponse({"isSuccess": False, "error": "Invalid or expired token"}, status=401)
 
+        token_record.active = False
+        token_record.save(update_fields=['active'])
+        token_cache.invalidate(context.token)
+        return JsonResponse({"isSuccess": True, "data": {"message": "Logged out"}}, status=200)
+
     except Exception as e:
         return JsonResponse({"isSuccess": False, "error": str(e)}, status=500)
 
@@ -232,9 +257,29 @@ def logout_user_view(request):
 # ----------- Product Views -----------
 
 @api_view(['GET'])
+@cache_catalog_response('product_list')
 def product_list(request):
-    products = Product.objects.filter(active=True).order_by('product_id')
+    # ?view=card serves compact cards from the denormalized product_card table.
+    if request.GET.get('view') == 'card':
+        listing, vendor_field = product_card_listing, 'vendor_id'
+    else:
+        listing, vendor_field = product_listing, 'created_by_id'
+
+    products = listing.prepare(listing.model.objects.filter(active=True).order_by('product_id'))
 
+    # ?sort=trending reads the precomputed product_trending ranking.
+    sort = request.GET.get('sort')
+    if sort not in (None, '', 'trending'):
+        return JsonResponse({"isSuccess": False, "error": "sort must be trending."}, status=drf_status.HTTP_400_BAD_REQUEST)
+    ordering = 'product_id'
+    if sort == 'trending':
+        products = order_by_trending(products)
+        ordering = ('-trending_score', 'product_id')
+
+    try:
+        products = apply_catalog_filters(products, request.GET, vendor_field=vendor_field)
+    except ValueError as e:
+        return JsonResponse({"isSuccess": False, "error": str(e)}, status=drf_status.HTTP_400_BAD_REQUEST)
 
     # Get page size from query parameters, default to 10
     page_size = request.GET.get('page_size', 10)
@@ -245,34 +290,102 @@ def product_list(request):
     except ValueError:
         page_size = 10
 
+    if is_cursor_request(request):
+        data = cursor_paginate(
+            request, products, ordering,
+            listing.many,
+            page_size=page_size
+        )
+        data["facets"] = catalog_facets(request.GET)
+        return JsonResponse({"isSuccess": True, "data": data, "error": None}, status=drf_status.HTTP_200_OK)
+
     paginator = PageNumberPagination()
     paginator.page_size = page_size
 
     result_page = paginator.paginate_queryset(products, request)
-    serializer = ProductSerializer(result_page, many=True)
 
     return JsonResponse({
         "isSuccess": True,
         "data": {
-            "results": serializer.data,
+            "results": listing.many(result_page),
             "total_items": paginator.page.paginator.count,
             "total_pages": paginator.page.paginator.num_pages,
             "current_page": paginator.page.number,
             "page_size": page_size,
             "next": paginator.get_next_link(),
-            "previous": paginator.get_previous_link()
+            "previous": paginator.get_previous_link(),
+            "facets": catalog_facets(request.GET)
         },
         "error": None
     }, status=drf_status.HTTP_200_OK)
 
 
 @api_view(['GET'])
+def product_search(request):
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({"isSuccess": False, "error": "Search query 'q' is required."}, status=drf_status.HTTP_400_BAD_REQUEST)
+
+    page_size = request.GET.get('page_size', 10)
+    try:
+        page_size = int(page_size)
+        if page_size < 1 or page_size > 100:
+            page_size = 10
+    except ValueError:
+        page_size = 10
+
+    try:
+        listing = product_card_listing if request.GET.get('view') == 'card' else product_listing
+        data = search_products(request, query, page_size, listing)
+    except InvalidSearchCursor as e:
+        return JsonResponse({"isSuccess": False, "error": str(e)}, status=drf_status.HTTP_400_BAD_REQUEST)
+    except SearchUnavailable as e:
+        return JsonResponse({"isSuccess": False, "error": str(e)}, status=drf_status.HTTP_501_NOT_IMPLEMENTED)
+
+    return JsonResponse({"isSuccess": True, "data": data, "error": None}, status=drf_status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@condition(etag_func=product_etag)
+@cache_catalog_response('product_retrieve')
 def product_retrieve(request, id):
     product = get_object_or_404(Product, product_id=id)
     serializer = ProductSerializer(product)
     return JsonResponse({"isSuccess": True, "data": serializer.data, "error": None}, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@cache_catalog_response('product_recommendations')
+def product_recommendations(request, id):
+    recommendations = (
+        ProductRecommendation.objects
+        .filter(product_id=id, recommended__card__active=True)
+        .select_related('recommended__card')
+        .order_by('rank')
+    )
+    results = [
+        dict(product_card_listing.row(recommendation.recommended.card), score=recommendation.score)
+        for recommendation in recommendations
+    ]
+    return JsonResponse({
+        "isSuccess": True,
+        "data": {"product_id": id, "results": results},
+        "error": None
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+def product_quote(request):
+    # Prices only; nothing is written and Cart rows are not involved.
+    if not isinstance(request.data, dict):
+        return JsonResponse({"isSuccess": False, "data": None, "error": "Expected a JSON object with an items list."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        results = quote(request.data.get('items'))
+    except QuoteError as e:
+        return JsonResponse({"isSuccess": False, "data": None, "error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return JsonResponse({"isSuccess": True, "data": {"results": results}, "error": None}, status=status.HTTP_200_OK)
+
+
 @api_view(['POST'])
 @vendor_required
 @require_access_token
@@ -294,6 +407,33 @@ def product_create(request):
     return JsonResponse({"isSuccess": False, "data": None, "error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@vendor_required
+@require_access_token
+def product_import(request):
+    # Rows are read straight from the request stream; request.data would
+    # buffer the whole upload.
+    read_rows = row_reader(request.content_type)
+    if read_rows is None:
+        return JsonResponse(
+            {"isSuccess": False, "data": None, "error": "Content-Type must be text/csv or application/x-ndjson."},
+            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        )
+
+    try:
+        report = import_products(read_rows(request._request), request.user)
+    except (UnicodeDecodeError, csv.Error) as e:
+        return JsonResponse({"isSuccess": False, "data": None, "error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not report["rows"]:
+        return JsonResponse({"isSuccess": False, "data": report, "error": "The upload contains no rows."}, status=status.HTTP_400_BAD_REQUEST)
+    # Rows that failed are listed in the report; the request succeeds if any row was imported.
+    error = f"{report['failed']} rows failed validation." if report["failed"] else None
+    if report["created"]:
+        return JsonResponse({"isSuccess": True, "data": report, "error": error}, status=status.HTTP_201_CREATED)
+    return JsonResponse({"isSuccess": False, "data": report, "error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+
 @api_view(['PUT'])
 @vendor_required
 @permission_classes([IsOwner])
@@ -332,30 +472,16 @@ def product_delete(request, id):
 @permission_classes([IsOwner])
 @require_access_token
 def like_product(request, product_id):
-    user = request.user
     product = get_object_or_404(Product, product_id=product_id)
 
     try:
-        with transaction.atomic():
-            like_obj = ProductLike.objects.filter(user=user, product=product).first()
-            
-            if like_obj:
-                like_obj.delete()
-                product.likes = F('likes') - 1
-                action = "unliked"
-            else:
-                ProductLike.objects.create(user=user, product=product)
-                product.likes = F('likes') + 1
-                action = "liked"
-
-            product.save(update_fields=['likes'])
-            product.refresh_from_db()
+        action = toggle_like(request.user, product.product_id)
 
         return JsonResponse({
             "isSuccess": True,
             "data": {
                 "product_id": product.product_id,
-                "likes": product.likes,
+                "likes": like_count(product.product_id),
                 "action": action
             },
             "error": None
@@ -368,6 +494,7 @@ def like_product(request, product_id):
 # ----------- ProductPrice Views -----------
 
 @api_view(['GET'])
+@cache_catalog_response('product_price_list')
 def product_price_list(request, id):
     if not Product.objects.filter(product_id=id).exists():
         return JsonResponse({
@@ -375,18 +502,24 @@ def product_price_list(request, id):
             "error": "Invalid product ID."
         }, status=status.HTTP_400_BAD_REQUEST)
 
-    prices = ProductPrice.objects.filter(product_id=id).order_by('product_price_id')
+    prices = product_price_listing.prepare(ProductPrice.objects.filter(product_id=id).order_by('product_price_id'))
+
+    if is_cursor_request(request):
+        data = cursor_paginate(
+            request, prices, 'product_price_id',
+            product_price_listing.many
+        )
+        return JsonResponse({"isSuccess": True, "data": data, "error": None}, status=status.HTTP_200_OK)
 
     paginator = PageNumberPagination()
     paginator.page_size = 10
 
     result_page = paginator.paginate_queryset(prices, request)
-    serializer = ProductPriceSerializer(result_page, many=True)
 
     return JsonResponse({
         "isSuccess": True,
         "data": {
-            "results": serializer.data,
+            "results": product_price_listing.many(result_page),
             "total_items": paginator.page.paginator.count,
             "total_pages": paginator.page.paginator.num_pages,
             "current_page": paginator.page.number,
@@ -418,6 +551,19 @@ def product_price_create(request, id):
     return JsonResponse({"isSuccess": False, "data": None, "error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@vendor_required
+@require_access_token
+def product_price_upsert(request, id=None):
+    if not isinstance(request.data, dict):
+        return JsonResponse({"isSuccess": False, "data": None, "error": [{"index": None, "errors": {"prices": "Expected a JSON object with a prices list."}}]}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        summary = upsert_prices(request.data.get('prices'), request.user, product_id=id)
+    except PriceUpsertError as e:
+        return JsonResponse({"isSuccess": False, "data": None, "error": e.errors}, status=status.HTTP_400_BAD_REQUEST)
+    return JsonResponse({"isSuccess": True, "data": summary, "error": None}, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 def product_price_retrieve(request, id, price_id):
     price = get_object_or_404(ProductPrice, product_price_id=price_id, product_id=id)
@@ -452,10 +598,11 @@ def product_price_delete(request, id, price_id):
 
 @api_view(['GET'])
 @require_access_token
+@condition(etag_func=order_list_etag)
 def order_list(request, id=None):
     user_id = request.user.user_data_id  
 
-    orders = Order.objects.filter(user_data_id=user_id)
+    orders = order_listing.prepare(Order.objects.filter(user_data_id=user_id))
 
     if id:
         orders = orders.filter(order_id=id)
@@ -465,16 +612,22 @@ def order_list(request, id=None):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+    if is_cursor_request(request):
+        data = cursor_paginate(
+            request, orders, ('-created_at', '-order_id'),
+            order_listing.many
+        )
+        return JsonResponse({"isSuccess": True, "data": data, "error": None}, status=status.HTTP_200_OK)
+
     paginator = PageNumberPagination()
     paginator.page_size = 10  
 
     result_page = paginator.paginate_queryset(orders, request)
-    serializer = OrderSerializer(result_page, many=True)
 
     return JsonResponse({
         "isSuccess": True,
         "data": {
-            "results": serializer.data,
+            "results": order_listing.many(result_page),
             "total_items": paginator.page.paginator.count,
             "total_pages": paginator.page.paginator.num_pages,
             "current_page": paginator.page.number,
@@ -504,6 +657,7 @@ def order_create(request):
 
     try:
         with transaction.atomic():
+            tariffs = load_tariffs(data.get('product_id') for data in data_list if isinstance(data, dict))
             for data in data_list:
                 product_id = data.get('product_id')
                 quantity = data.get('quantity')
@@ -514,13 +668,24 @@ def order_create(request):
                 if quantity is None or quantity <= 0:
                     return JsonResponse({"isSuccess": False, "error": "Quantity is required and must be greater than zero."}, status=status.HTTP_400_BAD_REQUEST)
 
-                # Fetch fresh product instance here to check stock and update later
+                timestamp_from = parse_datetime(str(data.get('timestamp_from') or ''))
+                timestamp_to = parse_datetime(str(data.get('timestamp_to') or ''))
+                if not timestamp_from or not timestamp_to or timestamp_from >= timestamp_to:
+                    return JsonResponse({"isSuccess": False, "error": "Valid timestamp_from and timestamp_to are required."}, status=status.HTTP_400_BAD_REQUEST)
+                if timezone.is_naive(timestamp_from):
+                    timestamp_from = make_aware(timestamp_from)
+                if timezone.is_naive(timestamp_to):
+                    timestamp_to = make_aware(timestamp_to)
+
+                # The product row lock serializes bookings of this product;
+                # stock is what its existing orders leave free for these dates.
                 product = Product.objects.select_for_update().get(product_id=product_id)
+                available = available_quantity(product, timestamp_from, timestamp_to)
 
-                if quantity > product.product_qty:
+                if quantity > available:
                     return JsonResponse({
                         "isSuccess": False,
-                        "error": f"Not enough stock for product '{product.product_name}'. Available: {product.product_qty}, requested: {quantity}."
+                        "error": f"Not enough stock for product '{product.product_name}'. Available: {available}, requested: {quantity}."
                     }, status=status.HTTP_400_BAD_REQUEST)
 
                 payment_data = {
@@ -547,15 +712,13 @@ def order_create(request):
                 order_serializer = OrderSerializer(data=order_data)
                 if not order_serializer.is_valid():
                     return JsonResponse({"isSuccess": False, "error": order_serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
-                order = order_serializer.save()
+                validated = order_serializer.validated_data
+                total_price = price_items([
+                    (product.product_id, validated['timestamp_from'], validated['timestamp_to'], validated['quantity'])
+                ], tariffs)[0]
+                order = order_serializer.save(total_price=to_money(total_price))
                 created_orders.append(order_serializer.data)
 
-                # Update product quantity and save
-                product.product_qty -= quantity
-                if product.product_qty < 0:
-                    raise ValueError(f"Product '{product.product_name}' stock cannot be negative.")
-                product.save()
-
         return JsonResponse({
             "isSuccess": True,
             "data": {
@@ -673,6 +836,7 @@ def status_list(request):
 
 
 @api_view(['GET'])
+@cache_catalog_response('category_list')
 def category_list(request):
     categories = Category.objects.all()
     serializer = CategorySerializer(categories, many=True)
@@ -685,6 +849,7 @@ def category_list(request):
 
 @api_view(['GET'])
 @require_access_token
+@condition(etag_func=user_profile_etag)
 def user_profile(request):
     user = request.user
 
@@ -762,18 +927,23 @@ def toggle_wishlist(request, product_id):
 def user_products(request):
     user = request.user
 
-    products_qs = Product.objects.filter(created_by_id=user.user_data_id).order_by('product_id')
+    products_qs = product_listing.prepare(Product.objects.filter(created_by_id=user.user_data_id).order_by('product_id'))
+
+    if is_cursor_request(request):
+        data = cursor_paginate(
+            request, products_qs, 'product_id',
+            product_listing.many
+        )
+        return JsonResponse({"isSuccess": True, "data": data, "error": None}, status=drf_status.HTTP_200_OK)
 
     paginator = PageNumberPagination()
     paginator.page_size = 10
     products_page = paginator.paginate_queryset(products_qs, request)
 
-    serializer = ProductSerializer(products_page, many=True)
-
     return JsonResponse({
         "isSuccess": True,
         "data": {
-            "results": serializer.data,
+            "results": product_listing.many(products_page),
             "total_items": paginator.page.paginator.count,
             "total_pages": paginator.page.paginator.num_pages,
             "current_page": paginator.page.number,
@@ -800,16 +970,21 @@ def update_profile_view(request):
     if user_contact is not None:
         user.user_contact = user_contact
 
-    if new_password:
-        user.user_password = make_password(new_password)
-
     try:
+        if new_password:
+            user.user_password = hashing_service.make_password(new_password)
+
         user.save()
         return JsonResponse({
             "isSuccess": True,
             "data": "Profile updated successfully.",
             "error": None
         }, status=drf_status.HTTP_200_OK)
+    except HashingBusy as e:
+        return JsonResponse({
+            "isSuccess": False,
+            "error": str(e)
+        }, status=drf_status.HTTP_503_SERVICE_UNAVAILABLE)
     except Exception as e:
         return JsonResponse({
             "isSuccess": False,
@@ -853,16 +1028,31 @@ def vendor_report(request):
             for o in recent_orders_qs
         ]
 
-        product_performance = products.annotate(
+        product_performance = list(products.annotate(
             orders_count=Count('orders', filter=Q(orders__status__status_name=completed_status))
-        ).values('product_id', 'product_name', 'orders_count')
+        ).values('product_id', 'product_name', 'orders_count'))
+
+        # Revenue uses the total stored on each order; orders placed before
+        # totals were stored are priced with the same tariff tables.
+        revenue = defaultdict(Decimal)
+        for product_id, total_price in completed_orders.filter(total_price__isnull=False).values_list('product_id', 'total_price'):
+            revenue[product_id] += total_price
+        legacy = list(completed_orders.filter(total_price__isnull=True).values_list(
+            'product_id', 'timestamp_from', 'timestamp_to', 'quantity'
+        ))
+        for (product_id, _, _, _), total_price in zip(legacy, price_items(legacy)):
+            revenue[product_id] += to_money(total_price)
+
+        for product in product_performance:
+            product['revenue'] = revenue.get(product['product_id'], Decimal('0.00'))
 
         return Response({
             "isSuccess": True,
             "data": {
                 "total_orders": total_orders,
+                "total_revenue": sum(revenue.values(), Decimal('0.00')),
                 "recent_orders": recent_orders,
-                "product_performance": list(product_performance),
+                "product_performance": product_performance,
             },
             "error": None
         })
@@ -887,7 +1077,7 @@ def vendor_orders(request, id=None):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    orders = Order.objects.filter(product__created_by_id=vendor_id)
+    orders = order_listing.prepare(Order.objects.filter(product__created_by_id=vendor_id))
 
     if id:
         orders = orders.filter(order_id=id)
@@ -897,15 +1087,21 @@ def vendor_orders(request, id=None):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+    if is_cursor_request(request):
+        data = cursor_paginate(
+            request, orders, ('-created_at', '-order_id'),
+            order_listing.many
+        )
+        return JsonResponse({"isSuccess": True, "data": data, "error": None}, status=status.HTTP_200_OK)
+
     paginator = PageNumberPagination()
     paginator.page_size = 10
     result_page = paginator.paginate_queryset(orders, request)
-    serializer = OrderSerializer(result_page, many=True)
 
     return JsonResponse({
         "isSuccess": True,
         "data": {
-            "results": serializer.data,
+            "results": order_listing.many(result_page),
             "total_items": paginator.page.paginator.count,
             "total_pages": paginator.page.paginator.num_pages,
             "current_page": paginator.page.number,
@@ -920,6 +1116,7 @@ def vendor_orders(request, id=None):
 @api_view(['GET'])
 @permission_classes([IsOwner])
 @require_access_token
+@condition(etag_func=cart_list_etag)
 def cart_list(request):
     """List all items in the user's cart."""
     user_data_id = request.user.user_data_id
@@ -1018,15 +1215,22 @@ def checkout(request):
 
     try:
         with transaction.atomic():
-            for cart_item in cart_items.select_for_update():
-                product = Product.objects.select_for_update().get(product_id=cart_item.product.product_id)
+            cart_items = list(cart_items.select_for_update())
+            # Charge exactly what the cart showed.
+            totals = price_items(
+                (item.product_id, item.timestamp_from, item.timestamp_to, item.quantity) for item in cart_items
+            )
+            for cart_item, total_price in zip(cart_items, totals):
+                # Orders created for earlier cart rows are already counted.
+                product = Product.objects.select_for_update().get(product_id=cart_item.product_id)
+                available = available_quantity(product, cart_item.timestamp_from, cart_item.timestamp_to)
 
-                if cart_item.quantity > product.product_qty:
+                if cart_item.quantity > available:
                     return JsonResponse({
                         "isSuccess": False,
                         "error": (
                             f"Not enough stock for product '{product.product_name}'. "
-                            f"Available: {product.product_qty}, requested: {cart_item.quantity}."
+                            f"Available: {available}, requested: {cart_item.quantity}."
                         )
                     }, status=400)
 
@@ -1052,16 +1256,10 @@ def checkout(request):
                 }
                 order_serializer = OrderSerializer(data=order_data)
                 order_serializer.is_valid(raise_exception=True)
-                order = order_serializer.save()
+                order = order_serializer.save(total_price=to_money(total_price))
                 created_orders.append(order_serializer.data)
 
-                # Update product quantity and save
-                product.product_qty -= cart_item.quantity
-                if product.product_qty < 0:
-                    raise ValueError(f"Product '{product.product_name}' stock cannot be negative.")
-                product.save()
-
-            cart_items.delete()
+            Cart.objects.filter(cart_id__in=[item.cart_id for item in cart_items]).delete()
 
         return JsonResponse({
             "isSuccess": True,
@@ -85,6 +85,105 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Use a shared backend (e.g. Redis or Memcached) in production: catalog cache
+# versions and token invalidations must be visible to every worker.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Public catalog responses are cached per catalog version; any catalog write
+# bumps the version.
+CATALOG_CACHE = {
+    'ENABLED': True,
+    'TTL': 300,
+    'STALE_TTL': 60,
+    'BACKEND': 'default',
+}
+
+# Bulk product imports are validated and written CHUNK_SIZE rows at a time;
+# the response lists at most MAX_ERRORS failing rows.
+PRODUCT_IMPORT = {
+    'CHUNK_SIZE': 500,
+    'MAX_ERRORS': 1000,
+}
+
+# Verified access tokens are cached per process for up to LOCAL_TTL seconds,
+# which bounds how long another worker may still accept a revoked token. Set
+# BACKEND to a CACHES alias to share entries across workers for up to TTL.
+ACCESS_TOKEN_CACHE = {
+    'ENABLED': True,
+    'TTL': 300,
+    'MAX_ENTRIES': 10000,
+    'BACKEND': os.getenv('ACCESS_TOKEN_CACHE_BACKEND') or None,
+    'LOCAL_TTL': 5,
+}
+
+# Compiled per-product tariff tables used to price carts, quotes and orders.
+# Price writes delete the entries; point BACKEND at a shared cache (e.g. Redis)
+# so every worker sees that. With a process-local backend entries live for at
+# most LOCAL_TTL seconds instead of TTL.
+TARIFF_CACHE = {
+    'TTL': 600,
+    'LOCAL_TTL': 10,
+    'BACKEND': os.getenv('TARIFF_CACHE_BACKEND', 'default'),
+}
+
+# 'write_behind' buffers last_used_at in memory and writes it with one bulk
+# UPDATE every FLUSH_INTERVAL seconds (and at worker exit) instead of per request.
+ACCESS_TOKEN_LAST_USED = {
+    'MODE': os.getenv('ACCESS_TOKEN_LAST_USED_MODE', 'sync'),
+    'FLUSH_INTERVAL': 30,
+    'MAX_PENDING': 5000,
+}
+
+# 'digest' stores and looks up a SHA-256 digest of each access token instead of
+# the full JWT. Keep FALLBACK on until `manage.py backfill_token_digests` has run.
+ACCESS_TOKEN_STORAGE = {
+    'MODE': os.getenv('ACCESS_TOKEN_STORAGE_MODE', 'full'),
+    'FALLBACK': True,
+}
+
+# PBKDF2 hashing for login/register/password changes runs in a process pool.
+# Requests beyond MAX_QUEUE outstanding jobs get a 503 instead of queueing.
+# Pool counters are logged every LOG_EVERY jobs (api.hashing logger).
+PASSWORD_HASHING = {
+    'ENABLED': True,
+    'WORKERS': int(os.getenv('PASSWORD_HASHING_WORKERS', 2)),
+    'MAX_QUEUE': 32,
+    'TIMEOUT': 10,
+    'LOG_EVERY': 1000,
+}
+
+# Bucket edges for the precomputed price facets on the product catalog.
+CATALOG_PRICE_BUCKETS = [0, 50, 100, 250, 500, 1000]
+
+# Like counts are buffered in this many shard rows per product until the
+# flush_like_counts command folds them into Product.likes.
+LIKE_COUNTER_SHARDS = 8
+
+# Trending ranking: likes, wishlist adds and completed orders from the last
+# WINDOW_DAYS, weighted by WEIGHTS and halved every HALF_LIFE_HOURS. Rebuilt
+# by `manage.py refresh_trending`, updated incrementally in between.
+TRENDING = {
+    'HALF_LIFE_HOURS': 72,
+    'WINDOW_DAYS': 30,
+    'WEIGHTS': {'like': 1.0, 'wishlist': 2.0, 'order': 5.0},
+}
+
+# "Customers also rented": TOP_K neighbours per product, rebuilt offline by
+# `manage.py rebuild_recommendations` (needs numpy and scipy). Interactions
+# are read CHUNK_SIZE rows at a time and co-occurrence is computed for
+# BLOCK_SIZE products at a time.
+RECOMMENDATIONS = {
+    'TOP_K': 20,
+    'BLOCK_SIZE': 2000,
+    'CHUNK_SIZE': 100000,
+    'WEIGHTS': {'order': 3.0, 'wishlist': 2.0, 'like': 1.0},
+}
+
 from datetime import timedelta
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),